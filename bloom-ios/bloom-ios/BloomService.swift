@@ -129,11 +129,11 @@ class BloomService: ObservableObject {
                 }
 
             case "error":
-                guard let jsonData = data.data(using: .utf8),
-                      let obj = try? JSONSerialization.jsonObject(with: jsonData) as? [String: String]
-                else { return }
+                // Extra fields (e.g. retry_after) must never drop the error itself
+                let obj = data.data(using: .utf8)
+                    .flatMap { try? JSONSerialization.jsonObject(with: $0) as? [String: Any] }
 
-                self.error = obj["error"]
+                self.error = obj?["error"] as? String ?? "Something went wrong — please try again"
                 self.isLoading = false
 
             default:
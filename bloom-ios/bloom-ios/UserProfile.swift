@@ -27,6 +27,16 @@ class UserProfile: ObservableObject {
     @Published var upcomingAppointments: [Appointment] = []
     @Published var pastAppointments: [Appointment] = []
     
+    // Stable per-install id, sent as user_id so the server can keep
+    // per-user caches (e.g. repeat photos) apart
+    let installID: String = {
+        let key = "bloom.install_id"
+        if let saved = UserDefaults.standard.string(forKey: key) { return saved }
+        let fresh = UUID().uuidString
+        UserDefaults.standard.set(fresh, forKey: key)
+        return fresh
+    }()
+    
     var recoveryStage: RecoveryStage {
         let weeks = weeksPostpartum
         if weeks < 1 { return .immediate }
@@ -92,6 +102,7 @@ class UserProfile: ObservableObject {
         ]
         
         return [
+            "user_id": installID,
             "user_role": role.rawValue,
             "delivery_type": deliveryType.rawValue,
             "recovery_stage": recoveryStageString,
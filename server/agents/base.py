@@ -0,0 +1,205 @@
+"""
+Bloom — Specialist Agent Base
+==============================
+The shared run loop for the four pillar agents. Subclasses only
+declare their pillar and action → prompt map.
+
+A request is answered from the first of these that fits:
+  1. the pre-generated library (generic text-only asks)
+  2. the response cache (identical text-only prompt)
+  3. the semantic cache (a similar generic question, opted-in tasks)
+  4. the photo cache (this user's near-identical photo, opted-in tasks)
+  5. Gemini — streamed field by field when the pipeline hands over a
+     partial_queue
+Replies are parsed against the task's response schema (see
+schemas.py); one that can't be used is replaced by the task's
+curated answer, marked "degraded" like an answer given while Gemini
+is down.
+
+Confidence takes one path for every answer (record_confidence):
+  "event"  → rate in the background, pipeline sends a later
+             "confidence" SSE event
+  "log"    → rate in the background, only recorded in the log
+  "inline" → ask for confidence as a field of the main response
+Cache hits skip the background rating.
+"""
+
+import asyncio
+import config
+import gemini_client
+import metrics
+import pregenerated
+import schemas
+from cache import TTLCache, shared_disk
+from context import BloomContext
+from fallbacks import static_response
+from json_stream import FieldStream
+from photo_cache import photo_cache, scope_for as photo_scope_for
+from semantic_cache import semantic_cache, scope_for
+from tasks import Task, get_task
+from prompts import Prompt
+from prompts.confidence import with_inline_confidence
+
+
+# Raw specialist replies keyed on prompt + model + generation config.
+# Shared by every pillar; per-task TTLs come from the registry.
+response_cache = TTLCache(
+    "response",
+    config.RESPONSE_CACHE_SIZE,
+    ttl=0,
+    max_bytes=config.RESPONSE_CACHE_BYTES,
+    disk=shared_disk()
+)
+
+
+def confidence_entry(pillar: str, action: str, confidence) -> dict:
+    return {
+        "agent": pillar,
+        "action": action,
+        "confidence": confidence
+    }
+
+
+async def rate_in_background(pillar: str, action: str, raw: str) -> dict | None:
+    """Second-opinion self-rating, run off the critical path."""
+    try:
+        confidence = await gemini_client.rate_confidence(raw)
+    except Exception:
+        # A failed rating only costs us the log entry
+        return None
+    return confidence_entry(pillar, action, confidence)
+
+
+def record_confidence(
+    context: BloomContext, pillar: str, action: str, response: dict, raw: str | None
+) -> None:
+    """
+    The one confidence path for every answer: take the inline rating
+    off the response, or schedule the background one for a fresh
+    reply (raw is None for cache hits, which skip the rating).
+    """
+    if config.CONFIDENCE_MODE == "inline":
+        context.confidence_log.append(
+            confidence_entry(pillar, action, response.pop("confidence", None))
+        )
+    elif raw is not None:
+        context.pending_confidence = asyncio.create_task(
+            rate_in_background(pillar, action, raw)
+        )
+
+
+class SpecialistAgent:
+    pillar: str = ""
+    default_action: str = ""
+    accepts_image: bool = False
+    ACTION_MAP: dict = {}
+
+    async def run(self, context: BloomContext) -> None:
+        """
+        Execute the specialist. Reads context.routed_action to pick
+        the right prompt, calls Gemini, writes the parsed response to
+        context.response and schedules (or records) the self-rating.
+        """
+        action = context.routed_action or self.default_action
+        prompt = self.build_prompt(action, context)
+
+        contents = [prompt.tail]
+        if self.accepts_image and context.has_image:
+            contents = [context.image_part, prompt.tail]
+
+        # Generic ask with a pre-generated answer? Identical text-only
+        # prompt answered recently? Reuse it. Failing
+        # that, opted-in generic tasks may reuse a similar question's answer,
+        # and photo tasks this user's analysis of a near-identical photo.
+        task = get_task(self.pillar, action)
+        label = task.name if task else f"{self.pillar}.{action}"
+        text_only = len(contents) == 1
+        cache_key = self._cache_key(task, prompt) if text_only else None
+        scope = scope_for(task, context) if task and text_only else None
+        photo_scope = photo_scope_for(task, context) if task and not text_only else None
+
+        raw = pregenerated.lookup(task, context) if task and text_only else None
+        if raw is None and cache_key:
+            raw = response_cache.get(cache_key)
+        if raw is None and scope:
+            raw = semantic_cache.lookup(scope, context.user_message, task.semantic_threshold)
+        if raw is None and photo_scope:
+            raw = photo_cache.lookup(
+                photo_scope, context.image_hash, context.user_message, task.photo_dedupe_threshold
+            )
+        cached = raw is not None
+
+        # Call Gemini — streamed when the pipeline is forwarding partials —
+        # unless this task's own model is behind an open breaker
+        if not cached and gemini_client.circuit_open(gemini_client.model_for(label)):
+            context.degraded = True
+        if not cached and not context.degraded:
+            try:
+                if context.partial_queue is not None:
+                    raw = await self._stream(contents, prompt.system, context.partial_queue, label)
+                else:
+                    raw = await gemini_client.call(contents, task=label, system=prompt.system)
+            except gemini_client.CircuitOpen:
+                context.degraded = True
+            except RuntimeError as e:
+                context.fail(e)
+                return
+
+        response = None if raw is None else schemas.parse(
+            raw, label, task.response_schema if task else None
+        )
+
+        # Gemini is unavailable (or its reply unusable) and nothing
+        # cached fits — curated answer, flagged either way
+        if response is None:
+            metrics.incr(f"fallback.{'unavailable' if raw is None else 'unparsable'}")
+            context.degraded = True
+            context.response = static_response(self.pillar, action)
+            context.response["pillar"] = self.pillar
+            context.response["degraded"] = True
+            context.steps_completed.append("specialist")
+            return
+
+        if not cached:
+            if cache_key:
+                response_cache.set(cache_key, raw, task.cache_ttl)
+            if scope:
+                semantic_cache.add(scope, context.user_message, raw)
+            if photo_scope:
+                photo_cache.add(photo_scope, context.image_hash, context.user_message, raw)
+
+        record_confidence(context, self.pillar, action, response, None if cached else raw)
+
+        context.response = response
+        context.response["pillar"] = self.pillar
+        if context.degraded:
+            context.response["degraded"] = True
+        context.steps_completed.append("specialist")
+
+    def build_prompt(self, action: str, context: BloomContext) -> Prompt:
+        """The full prompt for action — what run() sends for this context."""
+        prompt_fn = self.ACTION_MAP.get(action, self.ACTION_MAP[self.default_action])
+        prompt = prompt_fn(
+            user_message=context.user_message,
+            context=context.user_context
+        )
+        if config.CONFIDENCE_MODE == "inline":
+            prompt = with_inline_confidence(prompt)
+        return prompt
+
+    def _cache_key(self, task: Task | None, prompt: Prompt) -> str | None:
+        """Response cache key for a text-only prompt, or None if uncacheable."""
+        if not config.RESPONSE_CACHE or task is None or task.cache_ttl <= 0:
+            return None
+        return gemini_client.request_fingerprint(prompt, task.name)
+
+    async def _stream(self, contents: list, system: str, queue: asyncio.Queue, label: str) -> str:
+        """Stream the response, pushing each top-level field as it closes."""
+        chunks = []
+        fields = FieldStream()
+        async for chunk in gemini_client.stream(contents, task=label, system=system):
+            chunks.append(chunk)
+            for key, value in fields.feed(chunk):
+                if key != "confidence":
+                    queue.put_nowait({"field": key, "value": value})
+        return "".join(chunks)
@@ -0,0 +1,69 @@
+"""
+Bloom — Route-and-Answer Agent
+===============================
+Single-call alternative to RouterAgent + specialist for simple
+text-only requests. Sends one combined prompt for a shortlist of
+tasks and reads both the routing decision and the BloomResponse
+from the reply.
+
+Writes the same context fields as the two-stage path. If the model
+declines every candidate (or returns junk), context.response stays
+None and the pipeline falls back to RouterAgent. Confidence takes
+the same path as every specialist's (agents.base.record_confidence).
+"""
+
+import json
+import importlib
+import gemini_client
+import schemas
+from context import BloomContext
+from tasks import Task, schema_for
+from agents.base import record_confidence
+from prompts import Prompt
+from prompts.combined import build_combined_prompt
+
+
+class RouteAndAnswerAgent:
+
+    async def run(self, context: BloomContext, candidates: list[Task]) -> None:
+        prompt = build_combined_prompt(
+            user_message=context.user_message,
+            pillar_hint=context.pillar_hint or "none",
+            candidates=[
+                (t.name, t.description, self._specialist_prompt(t, context))
+                for t in candidates
+            ]
+        )
+
+        try:
+            raw = await gemini_client.call([prompt.tail], task="combined", system=prompt.system)
+        except RuntimeError as e:
+            context.fail(e)
+            return
+
+        reply = self._parse(raw)
+        task = next((t for t in candidates if t.name == reply.get("task")), None)
+        if task is None or not isinstance(reply.get("response"), dict):
+            return
+
+        response = reply["response"]
+        record_confidence(context, task.pillar, task.action, response, json.dumps(response))
+
+        context.routed_pillar   = task.pillar
+        context.routed_action   = task.action
+        context.router_reasoning = reply.get("reasoning", "")
+        context.response = response
+        context.response["pillar"] = task.pillar
+        context.steps_completed.extend(["router", "specialist"])
+
+    def _specialist_prompt(self, task: Task, context: BloomContext) -> Prompt:
+        """
+        The prompt the task's own specialist would have sent — inline
+        confidence instructions included, when that mode is on.
+        """
+        module = importlib.import_module(task.agent_module)
+        agent = getattr(module, task.agent_class)()
+        return agent.build_prompt(task.action, context)
+
+    def _parse(self, raw: str) -> dict:
+        return schemas.parse(raw, "combined", schema_for("combined")) or {}
@@ -5,9 +5,7 @@ Specialist agent for the Mind pillar. Handles mood check-ins,
 mood analysis, breathing exercises, and general emotional support.
 """
 
-import json
-import gemini_client
-from context import BloomContext
+from agents.base import SpecialistAgent
 from prompts import mind as mind_prompts
 
 
@@ -20,56 +18,8 @@ ACTION_MAP = {
 }
 
 
-class MindAgent:
-
-    def run(self, context: BloomContext) -> None:
-        """
-        Execute the Mind specialist. Reads context.routed_action
-        to pick the right prompt, calls Gemini, writes the parsed
-        response to context.response.
-        """
-        action = context.routed_action or "general_support"
-
-        # Look up the prompt builder
-        prompt_fn = ACTION_MAP.get(action, mind_prompts.general_support)
-        prompt = prompt_fn(
-            user_message=context.user_message,
-            context=context.user_context
-        )
-
-        # Call Gemini
-        try:
-            raw, confidence = gemini_client.call_with_confidence([prompt])
-            context.confidence_log.append({
-            "agent": "mind",
-            "action": action,
-            "confidence": confidence
-            })
-
-        except RuntimeError as e:
-            context.error = str(e)
-            return
-
-        # Parse and write to context
-        context.response = self._parse(raw)
-        context.response["pillar"] = "mind"
-        context.steps_completed.append("specialist")
-
-    def _parse(self, raw: str) -> dict:
-        cleaned = raw.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-
-        try:
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError:
-            return {
-                "title": "A moment for you",
-                "content": raw.strip(),
-                "suggestion": None,
-                "moodInsight": None
-            }
\ No newline at end of file
+class MindAgent(SpecialistAgent):
+    pillar = "mind"
+    default_action = "general_support"
+    accepts_image = False
+    ACTION_MAP = ACTION_MAP
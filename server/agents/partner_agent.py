@@ -7,9 +7,7 @@ gets specific, actionable suggestions based on what's actually
 happening right now.
 """
 
-import json
-import gemini_client
-from context import BloomContext
+from agents.base import SpecialistAgent
 from prompts import partner as partner_prompts
 
 
@@ -21,48 +19,9 @@ ACTION_MAP = {
 }
 
 
-class PartnerAgent:
-
-    def run(self, context: BloomContext) -> None:
-        action = context.routed_action or "general_partner_support"
-
-        prompt_fn = ACTION_MAP.get(action, partner_prompts.general_partner_support)
-        prompt = prompt_fn(
-            user_message=context.user_message,
-            context=context.user_context
-        )
-
-        # Partner pillar is text-only — no image needed
-        try:
-            raw, confidence = gemini_client.call_with_confidence([prompt])
-            context.confidence_log.append({
-            "agent": "mind",
-            "action": action,
-            "confidence": confidence
-            })
-        except RuntimeError as e:
-            context.error = str(e)
-            return
-
-        context.response = self._parse(raw)
-        context.response["pillar"] = "partner"
-        context.steps_completed.append("specialist")
-
-    def _parse(self, raw: str) -> dict:
-        cleaned = raw.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-
-        try:
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError:
-            return {
-                "title": "How to help",
-                "content": raw.strip(),
-                "suggestion": None,
-                "partnerActions": []
-            }
\ No newline at end of file
+class PartnerAgent(SpecialistAgent):
+    pillar = "partner"
+    default_action = "general_partner_support"
+    # Partner pillar is text-only — no image needed
+    accepts_image = False
+    ACTION_MAP = ACTION_MAP
@@ -9,15 +9,61 @@ after this agent runs to know what specialist to execute next.
 """
 
 import json
+from dataclasses import asdict
+import config
 import gemini_client
+import schemas
+from cache import TTLCache, fingerprint, normalize_message, shared_disk
 from context import BloomContext
 from prompts.router import build_router_prompt
-from tasks import all_task_names
+from tasks import all_task_names, schema_for, settings_for
+
+
+# Decisions are cached per router version: rendering the template with
+# blank inputs captures both the prompt text and the live task list, and
+# the router's ModelSettings (model, generation config) go in too, so
+# editing prompts/router.py, the registry or the router's settings
+# starts a fresh key space.
+ROUTER_CACHE_VERSION = fingerprint([
+    build_router_prompt("", "", "", all_task_names()),
+    asdict(settings_for("router")),
+])
+
+router_cache = TTLCache(
+    "router",
+    config.ROUTER_CACHE_SIZE,
+    config.ROUTER_CACHE_TTL,
+    disk=shared_disk()
+)
+
+
+def invalidate_router_cache() -> None:
+    """Forget every cached routing decision."""
+    router_cache.clear()
+
+
+def _cache_key(context: BloomContext) -> str:
+    """Normalized input plus the context fields that actually sway routing."""
+    routing_context = {
+        "role":      context.user_role,
+        "stage":     context.recovery_stage,
+        "delivery":  context.delivery_type,
+        "moods":     [e.get("mood") for e in context.mood_history[-3:]],
+        "sleep":     context.baby_data.get("sleep_status"),
+        "last_feed": context.baby_data.get("last_feed_time"),
+    }
+    return "|".join([
+        ROUTER_CACHE_VERSION,
+        normalize_message(context.user_message),
+        context.pillar_hint or "none",
+        "img" if context.has_image else "txt",
+        fingerprint(routing_context),
+    ])
 
 
 class RouterAgent:
 
-    def run(self, context: BloomContext) -> None:
+    async def run(self, context: BloomContext) -> None:
         """
         Execute the routing step. Writes to:
           context.routed_pillar
@@ -25,6 +71,10 @@ class RouterAgent:
           context.router_reasoning
         Sets context.error if something goes wrong.
         """
+        if self.from_cache(context):
+            return
+        key = _cache_key(context) if config.ROUTER_CACHE else None
+
         # Build the prompt with the live task registry
         prompt = build_router_prompt(
             user_message=context.user_message,
@@ -34,19 +84,36 @@ class RouterAgent:
         )
 
         # Call Gemini — include image if present so router can see what's being analyzed
-        contents = [prompt]
+        # (the low-res thumbnail is plenty to tell an incision from a baby)
+        contents = [prompt.tail]
         if context.has_image:
-            contents = [context.image, prompt]
+            contents = [context.router_image_part or context.image_part, prompt.tail]
 
         try:
-            raw = gemini_client.call(contents)
+            raw = await gemini_client.call(contents, task="router", system=prompt.system)
         except RuntimeError as e:
-            context.error = str(e)
+            context.fail(e)
             return
 
         # Parse the JSON response
         route = self._parse(raw)
+        if key and route.get("task") in all_task_names():
+            # Only cache real decisions, never the parse-failure fallback
+            router_cache.set(key, route)
+
+        self._apply(context, route)
 
+    def from_cache(self, context: BloomContext) -> bool:
+        """Apply a cached decision for this input, if there is one."""
+        if not config.ROUTER_CACHE:
+            return False
+        route = router_cache.get(_cache_key(context))
+        if route is None:
+            return False
+        self._apply(context, route)
+        return True
+
+    def _apply(self, context: BloomContext, route: dict) -> None:
         # Extract pillar and action from the task name (e.g. "mind.mood_checkin")
         task_name = route.get("task", "mind.general_support")
         parts = task_name.split(".", 1)
@@ -57,20 +124,8 @@ class RouterAgent:
         context.steps_completed.append("router")
 
     def _parse(self, raw: str) -> dict:
-        """Extract JSON from the router's response, handling markdown fences."""
-        cleaned = raw.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-
-        try:
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError:
-            # Safe fallback
-            return {
-                "task": "mind.general_support",
-                "reasoning": "Could not parse router output, defaulting to general support."
-            }
\ No newline at end of file
+        """The router's decision, or general support if the reply is unusable."""
+        return schemas.parse(raw, "router", schema_for("router")) or {
+            "task": "mind.general_support",
+            "reasoning": "Could not parse router output, defaulting to general support."
+        }
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Bloom — Circuit Breaker
+========================
+Stops sending work to a Gemini model that is down, so requests stop
+waiting out full timeouts one after another. One breaker per model:
+
+  closed    → calls flow; outcomes go into a rolling window
+  open      → BREAKER_FAILURES consecutive failures, or a failure
+              rate of BREAKER_FAILURE_RATE over the window, trips it:
+              calls fail instantly for BREAKER_COOLDOWN seconds
+  half-open → after the cooldown a single probe call is let through;
+              success closes the breaker, failure re-opens it
+
+Only outage-shaped failures count — timeouts, dropped connections,
+5xx. A 4xx means the model answered; a local overload never reached it.
+
+While the routing model's breaker is open requests are routed
+locally; while a specialist's model's breaker is open that specialist
+answers in degraded mode (see fallbacks.py) instead of calling Gemini.
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+import config
+import metrics
+
+WINDOW = 20         # recent outcomes per model
+MIN_CALLS = 10      # before the failure rate is trusted
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=WINDOW)
+        self._consecutive = 0
+        self._probing = False
+
+    def is_open(self) -> bool:
+        """True while calls would be refused. Doesn't change state."""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at < config.BREAKER_COOLDOWN
+        return self.state == "half_open" and self._probing
+
+    def allow(self) -> bool:
+        """Whether to make a call now (claims the probe when half-open)."""
+        if self.state == "open" and time.monotonic() - self.opened_at >= config.BREAKER_COOLDOWN:
+            self._set("half_open")
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        metrics.incr(f"breaker.{self.name}.rejected")
+        return False
+
+    def record(self, ok: Optional[bool]) -> None:
+        """Outcome of an allowed call: True up, False outage, None no signal."""
+        if ok is None:
+            self.abandon()
+            return
+        if self.state == "half_open":
+            self._set("closed" if ok else "open")
+            return
+
+        self._outcomes.append(ok)
+        self._consecutive = 0 if ok else self._consecutive + 1
+        failures = self._outcomes.count(False)
+        if self.state == "closed" and (
+            self._consecutive >= config.BREAKER_FAILURES
+            or (len(self._outcomes) >= MIN_CALLS
+                and failures / len(self._outcomes) >= config.BREAKER_FAILURE_RATE)
+        ):
+            self._set("open")
+
+    def abandon(self) -> None:
+        """An allowed call ended without telling us anything (e.g. cancelled)."""
+        self._probing = False
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        self._probing = False
+        if state == "open":
+            self.opened_at = time.monotonic()
+        if state != "half_open":
+            self._outcomes.clear()
+            self._consecutive = 0
+        metrics.incr(f"breaker.{self.name}.{state}")
+        metrics.gauge(f"breaker.{self.name}.open", int(state != "closed"))
+        print(f"   Circuit breaker for {self.name}: {state}")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def for_model(model: str) -> CircuitBreaker:
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = _breakers[model] = CircuitBreaker(model)
+    return breaker
+
+
+def snapshot() -> dict[str, str]:
+    """model → breaker state, for the health endpoint."""
+    return {name: b.state for name, b in sorted(_breakers.items())}
@@ -0,0 +1,289 @@
+"""
+Bloom — Caches
+===============
+In-process LRU caches with per-entry TTLs, bounded by entry count
+and optionally by payload bytes. Each cache reports its hits, misses
+and evictions to metrics under "cache.<name>.*".
+
+A cache can sit on top of a DiskCache: a SQLite file in WAL mode that
+every worker process on the host shares and that survives restarts.
+Memory misses fall through to disk and promote what they find; writes
+go to both. Hits on either tier are counted against the disk row, so
+at startup the hottest disk entries can be preloaded and a fresh
+deploy doesn't start cold.
+
+Keys are plain strings; callers build them from whatever inputs
+fully determine the cached value. Values must be JSON-serializable.
+"""
+
+import re
+import time
+import json
+import sqlite3
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+import config
+import metrics
+
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, unify apostrophes, strip punctuation and extra spaces."""
+    return _NON_WORD.sub(" ", message.lower().replace("’", "'")).strip()
+
+
+def fingerprint(value: Any, length: int = 16) -> str:
+    """Short stable hash of any JSON-serializable value."""
+    blob = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:length]
+
+
+def _sizeof(value: Any) -> int:
+    """Approximate payload size in bytes, for byte-bounded caches."""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, default=str).encode())
+
+
+class DiskCache:
+    """
+    Persistent tier shared across worker processes. One table, rows
+    namespaced by cache name. Evicts least recently used rows once the
+    file's payload passes max_bytes. Calls are synchronous — local
+    SQLite reads/writes are sub-millisecond.
+
+    Reads never write: hits (from either tier, see touch()) are tallied
+    in memory and flushed in one batch on the next write, before rows
+    are ranked or evicted, once FLUSH_EVERY keys are pending, and at
+    shutdown.
+    """
+
+    # Check the size cap every N writes rather than on every write
+    EVICT_EVERY = 64
+    # Flush pending hits once this many keys have some
+    FLUSH_EVERY = 256
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._writes = 0
+        # (namespace, key) → [hits, last_used] not yet written
+        self._pending: dict[tuple[str, str], list] = {}
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace  TEXT NOT NULL,
+                key        TEXT NOT NULL,
+                value      TEXT NOT NULL,
+                size       INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                hits       INTEGER NOT NULL DEFAULT 0,
+                last_used  REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[Any, float]]:
+        """(value, seconds left) for a live entry, else None."""
+        now = time.time()
+        row = self._db.execute(
+            "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self.touch(namespace, key)
+        return json.loads(row[0]), row[1] - now
+
+    def touch(self, namespace: str, key: str) -> None:
+        """Count a hit on this entry, to be written with the next flush."""
+        pending = self._pending.setdefault((namespace, key), [0, 0.0])
+        pending[0] += 1
+        pending[1] = time.time()
+        if len(self._pending) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the pending hit counts in one batch."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._db.executemany(
+            "UPDATE entries SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE namespace = ? AND key = ?",
+            [(hits, last_used, namespace, key) for (namespace, key), (hits, last_used) in pending.items()]
+        )
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        self.flush()
+        blob = json.dumps(value)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, size, expires_at, hits, last_used) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?)",
+            (namespace, key, blob, len(blob), now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Purge expired rows, then LRU rows until under max_bytes."""
+        self.flush()
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for rowid, size in self._db.execute("SELECT rowid, size FROM entries ORDER BY last_used"):
+            doomed.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+        metrics.incr("cache.disk.evict", len(doomed))
+
+    def hottest(self, namespace: str, limit: int) -> list[tuple[str, Any, float]]:
+        """Most-hit live entries: (key, value, seconds left)."""
+        self.flush()
+        now = time.time()
+        rows = self._db.execute(
+            "SELECT key, value, expires_at FROM entries WHERE namespace = ? AND expires_at > ? "
+            "ORDER BY hits DESC, last_used DESC LIMIT ?",
+            (namespace, now, limit)
+        ).fetchall()
+        return [(key, json.loads(value), expires_at - now) for key, value, expires_at in rows]
+
+    def clear(self, namespace: str) -> None:
+        self._db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+
+class TTLCache:
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        disk: Optional[DiskCache] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self._bytes = 0
+        # key → (expires_at, value, size_bytes), least recently used first
+        self._entries: OrderedDict[str, tuple[float, Any, int]] = OrderedDict()
+        if disk is not None:
+            _tiered.append(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._drop(key)
+            entry = None
+
+        promoted = False    # a disk hit, already counted by disk.get
+        if entry is None and self.disk is not None:
+            found = self.disk.get(self.name, key)
+            if found is not None:
+                metrics.incr(f"cache.{self.name}.disk_hit")
+                value, ttl_left = found
+                self._store(key, value, ttl_left)
+                entry = self._entries.get(key)
+                promoted = True
+
+        if entry is None:
+            metrics.incr(f"cache.{self.name}.miss")
+            return None
+
+        self._entries.move_to_end(key)
+        metrics.incr(f"cache.{self.name}.hit")
+        if self.disk is not None and not promoted:
+            self.disk.touch(self.name, key)
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._store(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(self.name, key, value, ttl)
+
+    def preload(self, limit: int) -> int:
+        """Warm memory with the hottest disk entries. Returns how many."""
+        if self.disk is None or limit <= 0:
+            return 0
+        hot = self.disk.hottest(self.name, min(limit, self.max_entries))
+        # Coldest first so the hottest end up most recently used
+        for key, value, ttl_left in reversed(hot):
+            self._store(key, value, ttl_left)
+        return len(hot)
+
+    def _store(self, key: str, value: Any, ttl: float) -> None:
+        size = _sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+            metrics.incr(f"cache.{self.name}.evict")
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after a prompt or registry change)."""
+        self._entries.clear()
+        self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear(self.name)
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ── Shared disk tier ──
+# One SQLite file per host, opened lazily by whichever cache asks first.
+
+_disk: Optional[DiskCache] = None
+_tiered: list[TTLCache] = []
+
+
+def shared_disk() -> Optional[DiskCache]:
+    """The host-wide DiskCache, or None if the disk tier is disabled."""
+    global _disk
+    if _disk is None and config.DISK_CACHE:
+        _disk = DiskCache(config.DISK_CACHE_PATH, config.DISK_CACHE_BYTES)
+    return _disk
+
+
+def flush_all() -> None:
+    """Write pending hit counts to disk (at shutdown)."""
+    if _disk is not None:
+        _disk.flush()
+
+
+def preload_all(limit: int) -> dict[str, int]:
+    """Warm every disk-backed cache at startup. Returns entries loaded per cache."""
+    return {c.name: c.preload(limit) for c in _tiered}
@@ -0,0 +1,195 @@
+"""
+Bloom — Runtime Settings
+=========================
+Pipeline knobs, read once from the environment (or .env) at import.
+Every optimization is switchable here so it can be turned off in
+production without a deploy.
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _set(name: str) -> set[str]:
+    """Comma-separated env var as a set, e.g. "mind,partner"."""
+    return {v.strip() for v in os.environ.get(name, "").split(",") if v.strip()}
+
+
+def _flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ── Speculative specialist execution ──
+# When the app sends a pillar hint, start that pillar's most likely
+# specialist alongside the router and keep it if the routes agree.
+SPECULATIVE_EXECUTION = _flag("BLOOM_SPECULATIVE", True)
+
+# ── Confidence self-rating ──
+# "event"  → rate after the result is sent, emit a "confidence" SSE event
+# "log"    → rate after the result is sent, only record it
+# "inline" → request confidence as a field of the main response (one call)
+CONFIDENCE_MODE = os.environ.get("BLOOM_CONFIDENCE_MODE", "event").strip().lower()
+
+# ── Token streaming ──
+# Specialists stream from Gemini and the pipeline forwards "partial"
+# SSE events as top-level response fields complete.
+STREAMING = _flag("BLOOM_STREAMING", True)
+
+# ── Gemini client ──
+# One pooled HTTP client per process. Each attempt gets GEMINI_TIMEOUT
+# (for streams: the longest wait for the next chunk); retryable
+# failures back off with jitter until attempts or the deadline run out.
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL") or None    # e.g. a local fake or proxy
+# Several keys (or keys from several projects) pool their quota:
+# GEMINI_API_KEYS="keyA,keyB:300" — optional :N is that key's requests
+# per minute, else GEMINI_KEY_RPM. Falls back to GEMINI_API_KEY.
+GEMINI_KEY_RPM = int(os.environ.get("BLOOM_GEMINI_KEY_RPM", "60"))
+GEMINI_TIMEOUT = float(os.environ.get("BLOOM_GEMINI_TIMEOUT", "30"))
+GEMINI_DEADLINE = float(os.environ.get("BLOOM_GEMINI_DEADLINE", "60"))
+GEMINI_MAX_ATTEMPTS = max(1, int(os.environ.get("BLOOM_GEMINI_MAX_ATTEMPTS", "3")))
+GEMINI_BACKOFF = float(os.environ.get("BLOOM_GEMINI_BACKOFF", "0.5"))          # first retry waits up to this
+GEMINI_BACKOFF_MAX = float(os.environ.get("BLOOM_GEMINI_BACKOFF_MAX", "8"))
+GEMINI_MAX_CONNECTIONS = int(os.environ.get("BLOOM_GEMINI_MAX_CONNECTIONS", "100"))
+GEMINI_KEEPALIVE_CONNECTIONS = int(os.environ.get("BLOOM_GEMINI_KEEPALIVE_CONNECTIONS", "20"))
+
+# ── Model tiering ──
+# Each task (and the router) declares its model, output cap, thinking
+# budget, temperature and latency SLO in tasks.py. Off: every call goes
+# to GEMINI_MODEL with the model's own defaults.
+MODEL_TIERING = _flag("BLOOM_MODEL_TIERING", True)
+GEMINI_MODEL = os.environ.get("BLOOM_GEMINI_MODEL", "gemini-3-pro-preview")
+GEMINI_FAST_MODEL = os.environ.get("BLOOM_GEMINI_FAST_MODEL", "gemini-2.5-flash")
+
+# ── Structured output ──
+# Ask Gemini for bare JSON matching each task's response schema (see
+# schemas.py). Replies are parsed and repaired by schemas.parse either way.
+STRUCTURED_OUTPUT = _flag("BLOOM_STRUCTURED_OUTPUT", True)
+
+# ── Context caching ──
+# A prompt's fixed instructions are cached on Gemini's side per key,
+# model and prompt version; calls reference them by handle (see
+# context_cache.py). Until the handle exists each call sends its own
+# instructions inline. Most prompts alone are under the cache minimum;
+# CONTEXT_CACHE_SHARED_PREFIX puts them all in one prefix (see
+# prompts/shared.py) that clears it — but then every call reads every
+# section, so it stays off until its answers have been evaluated.
+CONTEXT_CACHE = _flag("BLOOM_CONTEXT_CACHE", True)
+CONTEXT_CACHE_SHARED_PREFIX = _flag("BLOOM_CONTEXT_CACHE_SHARED_PREFIX", False)
+CONTEXT_CACHE_TTL = float(os.environ.get("BLOOM_CONTEXT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_MIN_TOKENS = int(os.environ.get("BLOOM_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+
+# ── Circuit breaker ──
+# Per model. Trips on BREAKER_FAILURES outages in a row (or the failure
+# rate over recent calls); while open, requests get a degraded answer
+# (cached or static) at once instead of waiting on Gemini.
+BREAKER = _flag("BLOOM_BREAKER", True)
+BREAKER_FAILURES = int(os.environ.get("BLOOM_BREAKER_FAILURES", "5"))
+BREAKER_FAILURE_RATE = float(os.environ.get("BLOOM_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.environ.get("BLOOM_BREAKER_COOLDOWN", "30"))
+
+# ── Adaptive concurrency limit ──
+# Open Gemini calls per process, adjusted AIMD-style on 429s and slow
+# calls. Calls over the limit wait in a bounded queue; past that the
+# pipeline answers with an "error" event carrying retry_after.
+LIMITER = _flag("BLOOM_LIMITER", True)
+LIMITER_INITIAL = int(os.environ.get("BLOOM_LIMITER_INITIAL", "16"))
+LIMITER_MIN = int(os.environ.get("BLOOM_LIMITER_MIN", "2"))
+LIMITER_MAX = int(os.environ.get("BLOOM_LIMITER_MAX", "128"))
+LIMITER_QUEUE = int(os.environ.get("BLOOM_LIMITER_QUEUE", "64"))
+LIMITER_QUEUE_TIMEOUT = float(os.environ.get("BLOOM_LIMITER_QUEUE_TIMEOUT", "5"))
+LIMITER_LATENCY_TARGET = float(os.environ.get("BLOOM_LIMITER_LATENCY_TARGET", "20"))
+LIMITER_BACKOFF = float(os.environ.get("BLOOM_LIMITER_BACKOFF", "0.7"))
+
+# ── Request hedging ──
+# A call still unanswered at HEDGE_PERCENTILE of its model+task's recent
+# latency gets a duplicate; the first answer wins. Hedges are capped at
+# HEDGE_MAX_RATE of calls.
+HEDGE = _flag("BLOOM_HEDGE", False)
+HEDGE_PERCENTILE = float(os.environ.get("BLOOM_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MAX_RATE = float(os.environ.get("BLOOM_HEDGE_MAX_RATE", "0.05"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("BLOOM_HEDGE_MIN_SAMPLES", "20"))
+
+# ── Local fast-path router ──
+# Keyword scorer that routes confident requests without a Gemini call.
+FAST_ROUTER = _flag("BLOOM_FAST_ROUTER", True)
+FAST_ROUTER_THRESHOLD = float(os.environ.get("BLOOM_FAST_ROUTER_THRESHOLD", "0.85"))
+
+# ── Single-call route-and-answer ──
+# Text-only requests whose hinted pillar (or individual task) is listed
+# here skip the separate router call: one prompt picks and answers.
+# A sampled fraction also runs RouterAgent in the background to
+# measure agreement with the two-stage path.
+COMBINED_PILLARS = _set("BLOOM_COMBINED_PILLARS")
+COMBINED_TASKS = _set("BLOOM_COMBINED_TASKS")
+COMBINED_SHADOW_RATE = float(os.environ.get("BLOOM_COMBINED_SHADOW_RATE", "0.05"))
+
+# ── Router decision cache ──
+# LRU+TTL cache of RouterAgent decisions keyed on the normalized
+# message, pillar hint, image flag and routing-relevant context.
+ROUTER_CACHE = _flag("BLOOM_ROUTER_CACHE", True)
+ROUTER_CACHE_SIZE = int(os.environ.get("BLOOM_ROUTER_CACHE_SIZE", "4096"))
+ROUTER_CACHE_TTL = float(os.environ.get("BLOOM_ROUTER_CACHE_TTL", "3600"))
+
+# ── Specialist response cache ──
+# Reuses the answer to an identical specialist prompt (same model and
+# generation config). TTLs are per task — see Task.cache_ttl.
+RESPONSE_CACHE = _flag("BLOOM_RESPONSE_CACHE", True)
+RESPONSE_CACHE_SIZE = int(os.environ.get("BLOOM_RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_BYTES = int(os.environ.get("BLOOM_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# ── Persistent cache tier ──
+# SQLite (WAL) file under the router and response caches, shared by
+# every worker on the host and kept across restarts. At startup the
+# hottest N entries per cache are preloaded into memory.
+DISK_CACHE = _flag("BLOOM_DISK_CACHE", True)
+DISK_CACHE_PATH = os.environ.get("BLOOM_DISK_CACHE_PATH", "bloom_cache.sqlite3")
+DISK_CACHE_BYTES = int(os.environ.get("BLOOM_DISK_CACHE_BYTES", str(256 * 1024 * 1024)))
+CACHE_PRELOAD = int(os.environ.get("BLOOM_CACHE_PRELOAD", "512"))
+
+# ── Semantic answer cache ──
+# Cross-user reuse of answers to near-identical generic questions.
+# Only tasks that declare Task.semantic_threshold take part.
+SEMANTIC_CACHE = _flag("BLOOM_SEMANTIC_CACHE", True)
+SEMANTIC_CACHE_SCOPES = int(os.environ.get("BLOOM_SEMANTIC_CACHE_SCOPES", "512"))
+SEMANTIC_CACHE_PER_SCOPE = int(os.environ.get("BLOOM_SEMANTIC_CACHE_PER_SCOPE", "256"))
+SEMANTIC_CACHE_TTL = float(os.environ.get("BLOOM_SEMANTIC_CACHE_TTL", "86400"))
+
+# ── Pre-generated responses ──
+# Answers for tasks that only depend on a few enumerable profile values,
+# rendered offline by `python pregenerated.py` and loaded at startup.
+# Only tasks that declare Task.pregenerate take part.
+PREGENERATED = _flag("BLOOM_PREGENERATED", True)
+PREGENERATED_PATH = os.environ.get("BLOOM_PREGENERATED_PATH", "pregenerated.json.gz")
+PREGENERATED_MAX_EXTRA_WORDS = int(os.environ.get("BLOOM_PREGENERATED_MAX_EXTRA_WORDS", "2"))
+
+# ── Repeat photo cache ──
+# Per-user reuse of a photo analysis when the same (or nearly the same)
+# photo is sent again with a similar message — retries, reconnects.
+# Only tasks that declare Task.photo_dedupe_threshold take part.
+PHOTO_CACHE = _flag("BLOOM_PHOTO_CACHE", True)
+PHOTO_CACHE_MAX_DISTANCE = int(os.environ.get("BLOOM_PHOTO_CACHE_MAX_DISTANCE", "6"))  # of 64 dHash bits
+PHOTO_CACHE_USERS = int(os.environ.get("BLOOM_PHOTO_CACHE_USERS", "1024"))
+PHOTO_CACHE_PER_USER = int(os.environ.get("BLOOM_PHOTO_CACHE_PER_USER", "8"))
+PHOTO_CACHE_TTL = float(os.environ.get("BLOOM_PHOTO_CACHE_TTL", "1800"))
+
+# ── Image preprocessing ──
+# Uploads are downscaled and re-encoded before any model call.
+IMAGE_MAX_DIMENSION = int(os.environ.get("BLOOM_IMAGE_MAX_DIMENSION", "1536"))
+IMAGE_JPEG_QUALITY = int(os.environ.get("BLOOM_IMAGE_JPEG_QUALITY", "85"))
+IMAGE_MAX_BYTES = int(os.environ.get("BLOOM_IMAGE_MAX_BYTES", str(1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.environ.get("BLOOM_IMAGE_MAX_PIXELS", str(50_000_000)))
+# Largest binary upload /bloom/upload will read before answering 413
+UPLOAD_MAX_BYTES = int(os.environ.get("BLOOM_UPLOAD_MAX_BYTES", str(15 * 1024 * 1024)))
+# The router sees a thumbnail this big (0 = send it the full image)
+ROUTER_THUMBNAIL_DIMENSION = int(os.environ.get("BLOOM_ROUTER_THUMBNAIL_DIMENSION", "384"))
+# Decode runs in worker processes (0 = a thread in this process).
+# At most WORKERS + QUEUE images are in flight; past that, new uploads
+# are turned away instead of piling up behind the pool.
+IMAGE_WORKERS = int(os.environ.get("BLOOM_IMAGE_WORKERS", "2"))
+IMAGE_QUEUE = int(os.environ.get("BLOOM_IMAGE_QUEUE", "8"))
+IMAGE_TIMEOUT = float(os.environ.get("BLOOM_IMAGE_TIMEOUT", "10"))
@@ -6,9 +6,10 @@ agentic pipeline. Every agent reads from it, writes to it.
 No global state, no random dicts — everything lives here.
 """
 
+import asyncio
 from dataclasses import dataclass, field
 from typing import Optional
-from PIL import Image
+from google.genai import types
 
 
 @dataclass
@@ -17,7 +18,10 @@ class BloomContext:
     user_message: str = ""
     pillar_hint: Optional[str] = None       # tab the user is on, or None
     user_context: dict = field(default_factory=dict)  # full UserProfile from iOS
-    image: Optional[Image.Image] = None     # decoded PIL image if uploaded
+    # Encoded once by the pipeline, reused by every model call (see images.py)
+    image_part: Optional[types.Part] = None         # full preprocessed image
+    router_image_part: Optional[types.Part] = None  # low-res thumbnail for routing
+    image_hash: Optional[int] = None                # dHash of the upload, for repeat detection
 
     # ── Router output (written by RouterAgent) ──
     routed_pillar: Optional[str] = None     # "mind" | "body" | "baby" | "partner"
@@ -26,9 +30,13 @@ class BloomContext:
 
     # ── Specialist output (written by the specialist agent) ──
     response: Optional[dict] = None         # the final BloomResponse JSON
+    pending_confidence: Optional[asyncio.Task] = None  # background self-rating
+    partial_queue: Optional[asyncio.Queue] = None       # streamed fields, if streaming
 
     # ── Pipeline metadata ──
     error: Optional[str] = None             # set if anything fails
+    retry_after: Optional[float] = None     # seconds, when the failure was overload
+    degraded: bool = False                  # specialist's model unavailable — cached/static answer
     steps_completed: list = field(default_factory=list)  # ["router", "specialist"]
 
     # ── Temporal memory ──
@@ -36,6 +44,11 @@ class BloomContext:
     confidence_log: list = field(default_factory=list)
 
 
+    def fail(self, error: Exception) -> None:
+        """Record a failed step (and, for overload, when to retry)."""
+        self.error = str(error)
+        self.retry_after = getattr(error, "retry_after", None)
+
     # ── Convenience accessors for agents ──
     @property
     def user_role(self) -> str:
@@ -63,4 +76,4 @@ class BloomContext:
 
     @property
     def has_image(self) -> bool:
-        return self.image is not None
\ No newline at end of file
+        return self.image_part is not None
\ No newline at end of file
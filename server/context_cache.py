@@ -0,0 +1,177 @@
+"""
+Bloom — Context Cache
+======================
+Keeps Gemini cached-content handles for the shared prompt prefix
+(see prompts/shared.py) — or any other fixed prompt part big enough
+to cache — so a call sends only its short tail and the model reads
+the instructions from cache.
+
+One handle per (API key, model, prompt version). Cached content
+belongs to the key's project, and the version is a fingerprint of
+the instruction text, so editing a prompt simply starts a new one:
+
+  miss    → the call goes out with the instructions inline, and a
+            handle is created in the background for later calls
+  hit     → the call names the handle instead of resending them
+  refresh → a handle still in use in the last REFRESH_SHARE of its
+            life has its TTL extended in the background
+  stale   → a call rejected because its handle is gone drops it and
+            is resent inline (see gemini_client)
+  skip    → prefixes estimated under CONTEXT_CACHE_MIN_TOKENS (the
+            model's minimum for caching) are always sent inline; a
+            failed create isn't retried for FAILURE_BACKOFF seconds
+
+The backend is injectable: GenaiBackend talks to the Gemini API
+through the key's client, and anything with the same three
+coroutines (e.g. an in-memory fake) can stand in for it.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, Protocol
+
+from google.genai import types
+
+import config
+import metrics
+from cache import fingerprint
+from key_pool import ApiKey
+
+REFRESH_SHARE = 0.2         # refresh once less than this share of the TTL is left
+EXPIRY_MARGIN = 10.0        # seconds — stop using a handle this close to expiry
+FAILURE_BACKOFF = 600.0     # seconds before retrying a failed create
+CHARS_PER_TOKEN = 4         # rough estimate, to skip prefixes below the minimum
+
+
+class CacheBackend(Protocol):
+    async def create(self, client: Any, model: str, system: str, ttl: float) -> str: ...
+    async def refresh(self, client: Any, name: str, ttl: float) -> None: ...
+    async def delete(self, client: Any, name: str) -> None: ...
+
+
+class GenaiBackend:
+    """Cached contents on the Gemini API, via a key's genai.Client."""
+
+    async def create(self, client: Any, model: str, system: str, ttl: float) -> str:
+        cached = await client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system,
+                ttl=f"{ttl:.0f}s",
+                display_name=f"bloom-{fingerprint(system, 12)}",
+            ),
+        )
+        return cached.name
+
+    async def refresh(self, client: Any, name: str, ttl: float) -> None:
+        await client.aio.caches.update(
+            name=name,
+            config=types.UpdateCachedContentConfig(ttl=f"{ttl:.0f}s"),
+        )
+
+    async def delete(self, client: Any, name: str) -> None:
+        await client.aio.caches.delete(name=name)
+
+
+@lru_cache(maxsize=32)
+def _version(system: str) -> str:
+    """Fingerprint of a prefix — hashed once, not on every call."""
+    return fingerprint(system, 32)
+
+
+@dataclass
+class _Handle:
+    name: str
+    client: Any
+    expires_at: float
+    refreshing: bool = False
+
+
+class ContextCache:
+
+    def __init__(self, backend: CacheBackend, ttl: float, min_tokens: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self._handles: dict[tuple[str, str, str], _Handle] = {}
+        self._failed_until: dict[tuple[str, str, str], float] = {}
+        self._tasks: dict[tuple[str, str, str], asyncio.Task] = {}
+
+    def handle(self, key: ApiKey, model: str, system: str) -> Optional[str]:
+        """
+        Name of a live handle for this prefix on this key and model, or
+        None — send the prefix inline (a handle is then made for next time).
+        """
+        if not config.CONTEXT_CACHE or len(system) / CHARS_PER_TOKEN < self.min_tokens:
+            return None
+        slot = (key.name, model, _version(system))
+        now = time.monotonic()
+
+        handle = self._handles.get(slot)
+        if handle is not None and now < handle.expires_at - EXPIRY_MARGIN:
+            if not handle.refreshing and handle.expires_at - now < self.ttl * REFRESH_SHARE:
+                handle.refreshing = True
+                self._spawn(("refresh",) + slot, self._refresh(handle))
+            metrics.incr("context_cache.hit")
+            return handle.name
+        if handle is not None:
+            del self._handles[slot]
+            metrics.incr("context_cache.expired")
+
+        metrics.incr("context_cache.miss")
+        if slot not in self._tasks and now >= self._failed_until.get(slot, 0.0):
+            self._spawn(slot, self._create(slot, key.client, model, system))
+        return None
+
+    def forget(self, name: str) -> None:
+        """Drop a handle Gemini no longer recognises."""
+        for slot, handle in list(self._handles.items()):
+            if handle.name == name:
+                del self._handles[slot]
+                metrics.incr("context_cache.stale")
+        self._gauge()
+
+    async def close(self) -> None:
+        """Stop background work and delete every handle we created."""
+        for task in self._tasks.values():
+            task.cancel()
+        handles, self._handles = list(self._handles.values()), {}
+        for handle in handles:
+            try:
+                await self.backend.delete(handle.client, handle.name)
+            except Exception:
+                pass    # it expires on its own
+        self._gauge()
+
+    def _spawn(self, slot: tuple, work) -> None:
+        task = asyncio.ensure_future(work)
+        self._tasks[slot] = task
+        task.add_done_callback(lambda _: self._tasks.pop(slot, None))
+
+    async def _create(self, slot: tuple, client: Any, model: str, system: str) -> None:
+        try:
+            name = await self.backend.create(client, model, system, self.ttl)
+        except Exception as e:
+            self._failed_until[slot] = time.monotonic() + FAILURE_BACKOFF
+            metrics.incr("context_cache.create_failed")
+            print(f"   Context cache for {model} not created ({e}) — sending instructions inline")
+            return
+        self._handles[slot] = _Handle(name, client, time.monotonic() + self.ttl)
+        metrics.incr("context_cache.created")
+        self._gauge()
+
+    async def _refresh(self, handle: _Handle) -> None:
+        try:
+            await self.backend.refresh(handle.client, handle.name, self.ttl)
+        except Exception:
+            metrics.incr("context_cache.refresh_failed")
+            return      # used until it expires, then recreated
+        finally:
+            handle.refreshing = False
+        handle.expires_at = time.monotonic() + self.ttl
+        metrics.incr("context_cache.refreshed")
+
+    def _gauge(self) -> None:
+        metrics.gauge("context_cache.handles", len(self._handles))
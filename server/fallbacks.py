@@ -0,0 +1,202 @@
+"""
+Bloom — Degraded-Mode Responses
+================================
+What the app shows when Gemini can't be reached (the model's circuit
+breaker is open) or its reply can't be used even after repair.
+Specialists still try their caches first; only when nothing cached
+fits do they fall back to the curated answer for the task here,
+counted as fallback.unavailable / fallback.unparsable.
+
+These are written to be safe for anyone on that task: no personal
+details, no assessment of anything we haven't actually looked at, and
+a clear pointer to a provider wherever symptoms or photos are involved.
+Every degraded answer carries "degraded": true so the app can say so.
+"""
+
+import copy
+
+_CALL_PROVIDER = (
+    "Call your provider right away for a fever over 100.4°F, heavy bleeding, "
+    "spreading redness, chest pain or trouble breathing, or thoughts of harming "
+    "yourself or your baby."
+)
+
+STATIC_RESPONSES: dict[str, dict] = {
+    # --- Mind ---
+    "mind.mood_checkin": {
+        "title": "Thank you for checking in",
+        "content": (
+            "Your mood is logged. Whatever you're feeling today is valid — the weeks "
+            "after birth bring big swings, and noticing them is already a kind thing "
+            "to do for yourself."
+        ),
+        "suggestion": "Take one slow breath and drink a glass of water before your next task.",
+        "moodInsight": None,
+    },
+    "mind.mood_analysis": {
+        "title": "Looking at your mood over time",
+        "content": (
+            "We can't put together your mood patterns right now. Ups and downs in the "
+            "first weeks are common; low moods that last most days for two weeks or "
+            "more are worth raising with your provider."
+        ),
+        "suggestion": "Keep logging — your history will be here when this is back.",
+        "moodInsight": None,
+    },
+    "mind.breathing_exercise": {
+        "title": "Box breathing",
+        "content": (
+            "Breathe in through your nose for four counts, hold for four, out through "
+            "your mouth for four, and hold for four. Let your shoulders drop on each "
+            "exhale."
+        ),
+        "suggestion": "Four rounds is enough to start.",
+        "breathing": {"name": "Box breathing", "inhaleSecs": 4, "holdSecs": 4, "exhaleSecs": 4, "rounds": 4},
+        "moodInsight": None,
+    },
+    "mind.general_support": {
+        "title": "We're here with you",
+        "content": (
+            "Bloom can't give you a personal answer right this moment, but you don't "
+            "have to carry everything alone. Reaching out to someone you trust — or "
+            "your provider — is always the right call. " + _CALL_PROVIDER
+        ),
+        "suggestion": "Try again in a few minutes for a fuller answer.",
+        "moodInsight": None,
+    },
+
+    # --- Body ---
+    "body.recovery_guidance": {
+        "title": "Gentle recovery basics",
+        "content": (
+            "Rest when you can, keep drinking water, eat regular small meals, and let "
+            "pain guide how much you do. Short, easy walks help circulation. "
+            + _CALL_PROVIDER
+        ),
+        "suggestion": "Try again in a few minutes for guidance tailored to your stage.",
+    },
+    "body.photo_analysis": {
+        "title": "We couldn't look at your photo",
+        "content": (
+            "Photo review isn't available right now, so we can't tell you anything "
+            "about this image. Keep the area clean and dry and watch for changes. "
+            + _CALL_PROVIDER
+        ),
+        "suggestion": "Send the photo again in a few minutes.",
+    },
+    "body.exercise_recommendation": {
+        "title": "Start small",
+        "content": (
+            "Until you're cleared for more, stick to gentle movement: short walks, "
+            "deep belly breathing, and pelvic floor squeezes. Stop if anything hurts."
+        ),
+        "suggestion": "Try again shortly for exercises matched to your recovery.",
+        "exerciseSteps": [
+            "Walk for 5–10 minutes at an easy pace",
+            "Lie on your back and take 5 slow belly breaths",
+            "Gently squeeze and lift your pelvic floor for 3 seconds, 5 times",
+        ],
+    },
+    "body.symptom_check": {
+        "title": "About your symptoms",
+        "content": (
+            "We can't review symptoms right now. If something feels wrong, trust "
+            "that and contact your provider. " + _CALL_PROVIDER
+        ),
+        "suggestion": "When in doubt, call — that's what your care team is there for.",
+    },
+
+    # --- Baby ---
+    "baby.cue_reading": {
+        "title": "We couldn't read this photo",
+        "content": (
+            "Photo review isn't available right now. Common early cues: rooting or "
+            "hands to mouth often mean hunger; yawning, looking away or fussing can "
+            "mean tired or overstimulated."
+        ),
+        "suggestion": "Send the photo again in a few minutes.",
+        "babyReadout": None,
+    },
+    "baby.feeding_guidance": {
+        "title": "Feeding basics",
+        "content": (
+            "Newborns usually feed 8–12 times a day. Watch for early hunger cues and "
+            "count wet diapers — about six a day after the first week is reassuring."
+        ),
+        "suggestion": "Try again shortly for guidance based on your baby's schedule.",
+    },
+    "baby.sleep_guidance": {
+        "title": "Safe sleep basics",
+        "content": (
+            "Always on their back, in their own crib or bassinet, on a firm flat "
+            "surface with nothing else in it. Newborn sleep comes in short stretches "
+            "— that's normal."
+        ),
+        "suggestion": "Try again shortly for tips tailored to your baby.",
+    },
+    "baby.general_baby_support": {
+        "title": "You're doing this",
+        "content": (
+            "Bloom can't give a personal answer right now. For a baby who seems unwell "
+            "— fever, trouble breathing, not feeding, fewer wet diapers — call your "
+            "pediatrician."
+        ),
+        "suggestion": "Try again in a few minutes.",
+        "babyReadout": None,
+    },
+
+    # --- Partner ---
+    "partner.help_suggestion": {
+        "title": "Ways to help right now",
+        "content": "Small, practical things make the biggest difference this week.",
+        "suggestion": "Pick one and do it without being asked.",
+        "partnerActions": [
+            "Bring water and a snack",
+            "Take the baby for an hour so your partner can sleep",
+            "Handle one household task start to finish",
+        ],
+    },
+    "partner.emotional_support": {
+        "title": "Being there",
+        "content": (
+            "Listening without fixing, noticing what your partner is doing well, and "
+            "saying it out loud go a long way. If they seem persistently low or "
+            "withdrawn, help them reach their provider."
+        ),
+        "suggestion": "Ask: what would help most in the next hour?",
+    },
+    "partner.feeding_help": {
+        "title": "Supporting feeds",
+        "content": (
+            "Set up water, snacks and a pillow before each feed, handle burping and "
+            "diaper changes, and take night duties you can cover."
+        ),
+        "suggestion": "Offer to do the next diaper change and settle afterwards.",
+    },
+    "partner.general_partner_support": {
+        "title": "You're part of this",
+        "content": (
+            "Bloom can't give a personal answer right now. Showing up — rest, food, "
+            "patience, and taking things off your partner's plate — is the support that counts."
+        ),
+        "suggestion": "Try again in a few minutes.",
+    },
+}
+
+
+# Used for an action with no curated answer of its own
+PILLAR_DEFAULTS = {
+    "mind":    "mind.general_support",
+    "body":    "body.recovery_guidance",
+    "baby":    "baby.general_baby_support",
+    "partner": "partner.general_partner_support",
+}
+
+
+def static_response(pillar: str, action: str) -> dict:
+    """The curated answer for pillar.action (or the pillar's general one)."""
+    response = (
+        STATIC_RESPONSES.get(f"{pillar}.{action}")
+        or STATIC_RESPONSES[PILLAR_DEFAULTS.get(pillar, "mind.general_support")]
+    )
+    return copy.deepcopy(response)
@@ -0,0 +1,98 @@
+"""
+Bloom — Local Fast-Path Router
+===============================
+A keyword scorer over the task registry that runs before RouterAgent.
+When it's confident, the request is routed locally and the Gemini
+routing call is skipped; otherwise RouterAgent decides as before.
+
+Scores come from each Task's declared keywords plus the UI pillar
+hint, the user role and whether an image was uploaded. Confidence is
+the softmax share of the best task, so a lone weak keyword never
+clears the threshold — only strong, agreeing signals do.
+
+Built once at import (server startup); classify() is a handful of
+substring checks and runs in microseconds.
+"""
+
+import math
+
+import config
+import metrics
+from cache import normalize_message
+from context import BloomContext
+from tasks import TASK_REGISTRY, Task
+
+KEYWORD_WEIGHT = 2.0    # per matched keyword phrase
+HINT_WEIGHT    = 1.0    # task is on the tab the user is looking at
+ROLE_WEIGHT    = 1.0    # partner tasks for a partner user
+IMAGE_WEIGHT   = 3.0    # image-capable task and an image was uploaded
+
+class KeywordRouter:
+
+    def __init__(self, tasks: list[Task]):
+        # Pre-pad phrases so matching is whole-word on a padded message,
+        # normalized the same way as every cache key (cache.normalize_message)
+        self._tasks = [(t, [f" {k} " for k in t.keywords]) for t in tasks]
+
+    def classify(self, context: BloomContext) -> tuple[Task, float, list[str]]:
+        """Best task, its confidence (0–1) and the keywords that matched."""
+        text = f" {normalize_message(context.user_message)} "
+        scored = []
+
+        for task, phrases in self._tasks:
+            if task.requires_image and not context.has_image:
+                continue
+            matched = [p.strip() for p in phrases if p in text]
+            score = KEYWORD_WEIGHT * len(matched)
+            if task.pillar == context.pillar_hint:
+                score += HINT_WEIGHT
+            if task.pillar == "partner" and context.user_role == "partner":
+                score += ROLE_WEIGHT
+            if task.requires_image and context.has_image:
+                score += IMAGE_WEIGHT
+            scored.append((score, task, matched))
+
+        top = max(s for s, _, _ in scored)
+        total = sum(math.exp(s - top) for s, _, _ in scored)
+        score, task, matched = max(scored, key=lambda x: x[0])
+        return task, 1.0 / total, matched
+
+
+_router = KeywordRouter(list(TASK_REGISTRY.values()))
+
+
+def route(context: BloomContext) -> bool:
+    """
+    Try to route locally. On a confident match, writes the routing
+    decision to context and returns True; otherwise returns False
+    and the caller falls back to RouterAgent.
+    """
+    if not config.FAST_ROUTER:
+        return False
+
+    task, confidence, matched = _router.classify(context)
+    if confidence < config.FAST_ROUTER_THRESHOLD:
+        metrics.incr("fast_router.fallback")
+        return False
+
+    metrics.incr("fast_router.hit")
+    context.routed_pillar = task.pillar
+    context.routed_action = task.action
+    context.router_reasoning = (
+        f"Local router matched {', '.join(matched) or 'context signals'} "
+        f"(confidence {confidence:.2f})."
+    )
+    context.steps_completed.append("fast_router")
+    return True
+
+
+def guess(context: BloomContext) -> None:
+    """Route to the best local match however unsure — for when Gemini can't route."""
+    task, confidence, matched = _router.classify(context)
+    context.routed_pillar = task.pillar
+    context.routed_action = task.action
+    context.router_reasoning = (
+        f"Best local match ({', '.join(matched) or 'context signals'}) "
+        f"while the full router is unavailable."
+    )
+    context.steps_completed.append("fast_router")
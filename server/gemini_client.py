@@ -3,80 +3,448 @@ Bloom — Gemini Client
 ======================
 Thin wrapper around google.genai. All agents call through here.
 Single place to swap models, set defaults, handle errors.
+
+Every call goes through the SDK's async client (client.aio), so a
+request waiting on Gemini yields the event loop instead of pinning
+a worker thread.
+
+Calls are spread over every configured API key (see key_pool.py);
+all keys share one pooled httpx client per process, so calls reuse
+warm TLS connections. Each call is bounded in time and transient
+failures are retried:
+
+  • retryable → timeouts, dropped connections, 408/429/5xx — retried
+    with full-jitter exponential backoff (Retry-After honoured)
+  • fatal     → everything else (bad request, auth, blocked prompt) —
+    raised at once
+
+Failures surface as GeminiError, a RuntimeError, so callers that
+catch RuntimeError keep working.
+
+Callers label each call with its task so slow outliers can be hedged
+against that task's normal latency (see hedging.py). Every attempt
+first takes a slot from the adaptive limiter (see limiter.py); when
+none is free in time the call fails at once with retry_after set.
+While a model's circuit breaker is open (see breaker.py) its calls
+fail at once with CircuitOpen.
+
+The task label also picks the call's model and generation config
+(max_output_tokens, thinking budget, temperature) from its
+ModelSettings in tasks.py, and its structured-output schema (see
+schemas.py), and each finished call's latency is
+recorded against that task's SLO:
+  gemini.{task}            → latency_ms timing
+  slo.{task}.met / missed  → counters (rates in the metrics snapshot)
+
+Callers pass a prompt's fixed instructions as system, apart from
+contents. When the shared prefix (see prompts/shared.py, off by
+default) holds them and the context cache (see context_cache.py) has
+a handle for it on this key and model, the call names the handle and
+opens with its section; otherwise — or when Gemini no longer knows
+the handle — the instructions go inline as the system instruction. Prompt tokens are
+counted as gemini.tokens.cached / uncached.
 """
 
+import asyncio
+import functools
 import os
+import random
 import sys
+import time
+from typing import AsyncIterator, Optional
+import httpx
 from dotenv import load_dotenv
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+import breaker
+import config
+import hedging
+import metrics
+from cache import fingerprint
+from context_cache import ContextCache, GenaiBackend
+from key_pool import ApiKey, KeyPool, retry_after_header
+from limiter import Overloaded, gemini_limiter
+from prompts import Prompt, shared
+from prompts.confidence import RATING_PROMPT
+from tasks import ModelSettings, schema_for, settings_for
 
 load_dotenv()
 
-MODEL = "gemini-3-pro-preview"
+MODEL = config.GEMINI_MODEL      # default model; per-task models are in tasks.py
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+STALE_CACHE_STATUS = {403, 404}     # cached content expired or deleted under us
+
+
+class GeminiError(RuntimeError):
+    """A failed Gemini call, after any retries."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after: Optional[float] = None
+
+
+class CircuitOpen(GeminiError):
+    """The model's circuit breaker is open — no call was made."""
+
+
+def _parse_keys() -> list[tuple[str, int]]:
+    """(api_key, requests per minute) for every configured key."""
+    entries = os.environ.get("GEMINI_API_KEYS") or os.environ.get("GEMINI_API_KEY") or ""
+    parsed = []
+    for entry in filter(None, (e.strip() for e in entries.split(","))):
+        key, _, rpm = entry.partition(":")
+        parsed.append((key, int(rpm) if rpm else config.GEMINI_KEY_RPM))
+    return parsed
+
+
+def get_client(api_key: str, http: httpx.AsyncClient) -> genai.Client:
+    """A Gemini client for one key, on the shared connection pool."""
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            base_url=config.GEMINI_BASE_URL,
+            httpx_async_client=http,
+        ),
+    )
 
 
-def get_client() -> genai.Client:
-    """Initialize and return a Gemini client. Exits if no API key."""
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
+def get_pool() -> KeyPool:
+    """Initialize the key pool. Exits if no API key."""
+    parsed = _parse_keys()
+    if not parsed:
         print("❌ GEMINI_API_KEY not set. Add it to .env")
         sys.exit(1)
-    return genai.Client(api_key=api_key)
+    # One connection pool for every key — they all talk to the same host
+    http = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=config.GEMINI_KEEPALIVE_CONNECTIONS,
+        ),
+        # Deadlines are enforced per attempt below; httpx only bounds connecting
+        timeout=httpx.Timeout(None, connect=10.0),
+    )
+    return KeyPool([
+        ApiKey(f"key{i}", get_client(key, http), rpm)
+        for i, (key, rpm) in enumerate(parsed, start=1)
+    ])
 
 
-# Module-level client — created once on import
-client = get_client()
+# Module-level pool — created once on import
+keys = get_pool()
 
+# Cached-content handles for prompt prefixes, per key and model
+context_caches = ContextCache(
+    GenaiBackend(),
+    ttl=config.CONTEXT_CACHE_TTL,
+    min_tokens=config.CONTEXT_CACHE_MIN_TOKENS,
+)
 
-from google.genai import types
 
-def call(contents: list, model: str = MODEL) -> str:
-    try:
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                safety_settings=[
-                    # Categories MUST have the HARM_CATEGORY_ prefix
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HATE_SPEECH", 
-                        threshold="BLOCK_NONE"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HARASSMENT", 
-                        threshold="BLOCK_NONE"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_DANGEROUS_CONTENT", 
-                        threshold="BLOCK_NONE"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_SEXUALLY_EXPLICIT", 
-                        threshold="BLOCK_ONLY_HIGH"
-                    ),
-                ]
-            )
-        )
-        return response.text
-    except Exception as e:
-        raise RuntimeError(f"Gemini API error: {e}")
-
-def call_with_confidence(contents: list, model: str = MODEL) -> tuple[str, str]:
-    response = client.models.generate_content(
-        model=model,
-        contents=contents
-    )
-    text = response.text
+# Categories MUST have the HARM_CATEGORY_ prefix
+SAFETY_SETTINGS = [
+    types.SafetySetting(
+        category="HARM_CATEGORY_HATE_SPEECH",
+        threshold="BLOCK_NONE"
+    ),
+    types.SafetySetting(
+        category="HARM_CATEGORY_HARASSMENT",
+        threshold="BLOCK_NONE"
+    ),
+    types.SafetySetting(
+        category="HARM_CATEGORY_DANGEROUS_CONTENT",
+        threshold="BLOCK_NONE"
+    ),
+    types.SafetySetting(
+        category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        threshold="BLOCK_ONLY_HIGH"
+    ),
+]
 
-    confidence_prompt = (
-        "Briefly rate your confidence in this response from 0–1 "
-        "and say what information would change your decision."
+
+@functools.lru_cache(maxsize=None)
+def _config(task: str) -> types.GenerateContentConfig:
+    """Generation config for calls labelled task."""
+    settings = settings_for(task)
+    thinking = settings.thinking_budget
+    schema = schema_for(task) if config.STRUCTURED_OUTPUT else None
+    return types.GenerateContentConfig(
+        safety_settings=SAFETY_SETTINGS,
+        response_mime_type="application/json" if schema else None,
+        response_schema=schema,
+        max_output_tokens=settings.max_output_tokens,
+        temperature=settings.temperature,
+        thinking_config=None if thinking is None else types.ThinkingConfig(thinking_budget=thinking),
     )
 
-    confidence_resp = client.models.generate_content(
-        model=model,
-        contents=[text, confidence_prompt]
+
+def _request_config(task: str, system: Optional[str], cached: Optional[str]) -> types.GenerateContentConfig:
+    """The task's config plus its instructions — by cache handle if there is one."""
+    if cached:
+        return _config(task).model_copy(update={"cached_content": cached})
+    if system:
+        return _config(task).model_copy(update={"system_instruction": system})
+    return _config(task)
+
+
+def _cached_request(key: ApiKey, model: str, task: str, contents: list, system: Optional[str]):
+    """
+    (contents, cached-content handle) for this call: the shared prefix's
+    handle and an opening section line when the prefix holds system,
+    else a handle for system itself — or the contents as given and None.
+    """
+    if not system:
+        return contents, None
+    if shared.holds(task, system):
+        cached = context_caches.handle(key, model, shared.prefix())
+        return ([shared.opener(task), *contents] if cached else contents), cached
+    return contents, context_caches.handle(key, model, system)
+
+
+def model_for(task: str) -> str:
+    """The model calls labelled task go to."""
+    return settings_for(task).model
+
+
+def image_part(jpeg: bytes) -> types.Part:
+    """Wrap preprocessed JPEG bytes for a multimodal call."""
+    return types.Part.from_bytes(data=jpeg, mime_type="image/jpeg")
+
+
+def request_fingerprint(prompt: Prompt, task: str = "") -> str:
+    """Stable key for a text-only request: prompt, model and generation config."""
+    settings = settings_for(task)
+    return fingerprint(
+        [prompt.system, prompt.tail, settings.model, _config(task).model_dump(mode="json", exclude_none=True)],
+        length=32
     )
 
-    return text, confidence_resp.text
+
+def _classify(e: Exception) -> GeminiError:
+    """Wrap any failure from the SDK or transport as retryable or fatal."""
+    if isinstance(e, GeminiError):
+        return e
+    if isinstance(e, Overloaded):
+        # Already waited our turn locally — retrying would only queue again
+        error = GeminiError(str(e), status=429)
+        error.retry_after = e.retry_after
+        return error
+    if isinstance(e, errors.APIError):
+        error = GeminiError(f"Gemini API error: {e}", status=e.code, retryable=e.code in RETRYABLE_STATUS)
+        error.retry_after = retry_after_header(e)
+        return error
+    if isinstance(e, TimeoutError):
+        return GeminiError(f"Gemini API error: no response within {config.GEMINI_TIMEOUT:g}s", retryable=True)
+    if isinstance(e, httpx.TransportError):
+        return GeminiError(f"Gemini API error: {type(e).__name__}: {e}", retryable=True)
+    return GeminiError(f"Gemini API error: {e}")
+
+
+def circuit_open(model: str = MODEL) -> bool:
+    """True while calls to model would be refused by its breaker."""
+    return config.BREAKER and breaker.for_model(model).is_open()
+
+
+def _admit(model: str) -> breaker.CircuitBreaker | None:
+    """The model's breaker, once it has let this attempt through."""
+    if not config.BREAKER:
+        return None
+    circuit = breaker.for_model(model)
+    if not circuit.allow():
+        raise CircuitOpen(f"Gemini model {model} is unavailable right now", status=503)
+    return circuit
+
+
+def _report(circuit: breaker.CircuitBreaker | None, error: Optional[GeminiError]) -> None:
+    """Tell the breaker how an attempt went — only outages count against it."""
+    if circuit is None:
+        return
+    if error is None:
+        circuit.record(True)
+    elif error.status == 429:
+        circuit.record(None)    # throttled or refused locally — says nothing about the model
+    else:
+        circuit.record(not error.retryable)
+
+
+def _attempt_timeout(deadline: float) -> float:
+    return max(0.0, min(config.GEMINI_TIMEOUT, deadline - time.monotonic()))
+
+
+def _count_tokens(usage: Optional[types.GenerateContentResponseUsageMetadata]) -> None:
+    if usage is None or not usage.prompt_token_count:
+        return
+    cached = usage.cached_content_token_count or 0
+    metrics.incr("gemini.tokens.cached", cached)
+    metrics.incr("gemini.tokens.uncached", usage.prompt_token_count - cached)
+
+
+def _observe(task: str, settings: ModelSettings, started: float) -> None:
+    """Record a finished call's latency against its task's SLO."""
+    ms = (time.monotonic() - started) * 1000
+    label = task or "unlabelled"
+    metrics.observe(f"gemini.{label}", ms)
+    if settings.latency_slo_ms:
+        metrics.incr(f"slo.{label}.{'met' if ms <= settings.latency_slo_ms else 'missed'}")
+
+
+async def _backoff(error: GeminiError, attempt: int, deadline: float) -> None:
+    """Sleep before the next attempt, or raise if this failure is final."""
+    delay = random.uniform(0, min(config.GEMINI_BACKOFF_MAX, config.GEMINI_BACKOFF * 2 ** (attempt - 1)))
+    # A quota error only has to be waited out if no other key is fresh
+    if error.retry_after is not None and (error.status != 429 or not keys.available()):
+        delay = max(delay, error.retry_after)
+
+    if (
+        not error.retryable
+        or attempt >= config.GEMINI_MAX_ATTEMPTS
+        or time.monotonic() + delay >= deadline
+    ):
+        metrics.incr("gemini.error.retryable" if error.retryable else "gemini.error.fatal")
+        raise error
+    metrics.incr("gemini.retry")
+    await asyncio.sleep(delay)
+
+
+async def call(contents: list, task: str = "", system: Optional[str] = None) -> str:
+    settings = settings_for(task)
+    model = settings.model
+    hedge_key = (model, task, "call")
+
+    async def attempt_once():
+        async with gemini_limiter.slot():
+            key = keys.pick()
+            with keys.use(key) as client:
+                sent, cached = _cached_request(key, model, task, contents, system)
+                try:
+                    return await client.aio.models.generate_content(
+                        model=model,
+                        contents=sent,
+                        config=_request_config(task, system, cached)
+                    )
+                except errors.APIError as e:
+                    if cached is None or e.code not in STALE_CACHE_STATUS:
+                        raise
+                    context_caches.forget(cached)
+                return await client.aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=_request_config(task, system, None)
+                )
+
+    call_started = time.monotonic()
+    deadline = call_started + config.GEMINI_DEADLINE
+    for attempt in range(1, config.GEMINI_MAX_ATTEMPTS + 1):
+        circuit = _admit(model)
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(_attempt_timeout(deadline)):
+                response = await hedging.race(attempt_once, hedge_key)
+            hedging.record(hedge_key, time.monotonic() - started)
+            _report(circuit, None)
+            _observe(task, settings, call_started)
+            _count_tokens(response.usage_metadata)
+            return response.text
+        except Exception as e:
+            error = _classify(e)
+            _report(circuit, error)
+        except asyncio.CancelledError:
+            if circuit:
+                circuit.abandon()
+            raise
+        await _backoff(error, attempt, deadline)
+
+
+async def stream(contents: list, task: str = "", system: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Like call(), but yields text chunks as the model produces them.
+    Retried (and hedged, on time to first chunk) only until the first
+    chunk is out — after that a failure is raised, since the caller
+    has already used part of the answer.
+    """
+    settings = settings_for(task)
+    model = settings.model
+    hedge_key = (model, task, "first_chunk")
+
+    async def open_with(client, sent, cached):
+        chunks = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=sent,
+            config=_request_config(task, system, cached)
+        )
+        try:
+            async for chunk in chunks:
+                if chunk.text:
+                    return chunks, chunk.text
+        except BaseException:
+            await chunks.aclose()
+            raise
+        return chunks, None
+
+    async def open_once():
+        async with gemini_limiter.slot():
+            key = keys.pick()
+            with keys.use(key) as client:
+                sent, cached = _cached_request(key, model, task, contents, system)
+                try:
+                    return await open_with(client, sent, cached)
+                except errors.APIError as e:
+                    if cached is None or e.code not in STALE_CACHE_STATUS:
+                        raise
+                    context_caches.forget(cached)
+                return await open_with(client, contents, None)
+
+    def close_loser(opened):
+        asyncio.ensure_future(opened[0].aclose())
+
+    call_started = time.monotonic()
+    deadline = call_started + config.GEMINI_DEADLINE
+    for attempt in range(1, config.GEMINI_MAX_ATTEMPTS + 1):
+        circuit = _admit(model)
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(_attempt_timeout(deadline)):
+                chunks, first = await hedging.race(open_once, hedge_key, discard=close_loser)
+            hedging.record(hedge_key, time.monotonic() - started)
+            _report(circuit, None)
+        except Exception as e:
+            error = _classify(e)
+            _report(circuit, error)
+            await _backoff(error, attempt, deadline)
+            continue
+        except asyncio.CancelledError:
+            if circuit:
+                circuit.abandon()
+            raise
+
+        if first is None:
+            _observe(task, settings, call_started)
+            return
+        yield first
+        usage = None
+        try:
+            while True:
+                # The timeout wraps the wait only, never our own yield
+                async with asyncio.timeout(config.GEMINI_TIMEOUT):
+                    chunk = await anext(chunks, None)
+                if chunk is None:
+                    _observe(task, settings, call_started)
+                    _count_tokens(usage)
+                    return
+                usage = chunk.usage_metadata or usage
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            error = _classify(e)
+            error.retryable = False
+            metrics.incr("gemini.error.stream_broken")
+            raise error
+        finally:
+            await chunks.aclose()
+
+
+async def rate_confidence(response_text: str) -> str:
+    """Ask the model to self-rate a response it already produced."""
+    return await call([response_text, RATING_PROMPT], task="confidence")
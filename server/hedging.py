@@ -0,0 +1,110 @@
+"""
+Bloom — Request Hedging
+========================
+Trims Gemini's latency tail. If a call hasn't answered by the usual
+slow-end latency for its model and task (HEDGE_PERCENTILE of recent
+samples), a duplicate is fired; whichever answers first wins and the
+other is cancelled.
+
+  • Per key: latency windows are kept per (model, task, kind) — the
+    router, each specialist task and streamed time-to-first-chunk
+    all have different normal speeds
+  • Bounded: each call earns HEDGE_MAX_RATE of a hedge token, each
+    hedge spends one, so duplicates never exceed that share of
+    traffic (plus a small burst)
+  • No hedging until a key has HEDGE_MIN_SAMPLES samples
+
+gemini_client decides what a "call" is; this module only times and
+races them.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+import config
+import metrics
+
+WINDOW = 256        # recent samples kept per key
+BURST = 10          # hedge tokens that can be banked
+
+_samples: dict[tuple, deque] = {}
+_tokens = 0.0
+
+
+def record(key: tuple, seconds: float) -> None:
+    """Add a successful call's latency to its key's window."""
+    window = _samples.get(key)
+    if window is None:
+        window = _samples[key] = deque(maxlen=WINDOW)
+    window.append(seconds)
+
+
+def delay_for(key: tuple) -> Optional[float]:
+    """Seconds to wait before hedging this key, or None to not hedge."""
+    window = _samples.get(key)
+    if not config.HEDGE or not window or len(window) < config.HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(window)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * config.HEDGE_PERCENTILE))]
+
+
+def _take_token() -> bool:
+    global _tokens
+    if _tokens < 1:
+        return False
+    _tokens -= 1
+    return True
+
+
+async def race(
+    make: Callable[[], Awaitable[Any]],
+    key: tuple,
+    discard: Optional[Callable[[Any], Any]] = None
+) -> Any:
+    """
+    Await make(), hedging it with a second make() if it runs past the
+    key's deadline. discard(result) cleans up a loser that finished
+    anyway (e.g. closes an open stream).
+    """
+    global _tokens
+    _tokens = min(BURST, _tokens + config.HEDGE_MAX_RATE)
+
+    first = asyncio.ensure_future(make())
+    tasks = [first]
+    try:
+        delay = delay_for(key)
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if _take_token():
+                    metrics.incr("gemini.hedge.fired")
+                    tasks.append(asyncio.ensure_future(make()))
+                else:
+                    metrics.incr("gemini.hedge.capped")
+
+        pending = set(tasks)
+        failure = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(tasks) > 1:
+                        metrics.incr("gemini.hedge.won" if task is not first else "gemini.hedge.lost")
+                    return _finish(task, tasks, discard)
+                failure = failure or task.exception()
+        raise failure
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def _finish(winner: asyncio.Future, tasks: list, discard) -> Any:
+    for task in tasks:
+        if task is not winner and discard is not None:
+            # A loser may still complete before its cancellation lands
+            task.add_done_callback(
+                lambda t: t.cancelled() or t.exception() or discard(t.result())
+            )
+    return winner.result()
@@ -0,0 +1,126 @@
+"""
+Bloom — Image Worker Pool
+==========================
+Runs preprocess_image in separate worker processes so a burst of
+photo uploads decodes in parallel without holding this process's GIL
+— text-only requests on the same event loop never wait behind PIL.
+
+  • Bounded: at most IMAGE_WORKERS + IMAGE_QUEUE images in flight.
+    Past that, submit() raises PoolBusy at once rather than queueing
+    without limit.
+  • Per-image timeout: the request gives up after IMAGE_TIMEOUT. An
+    image still waiting in the queue is cancelled; one already being
+    decoded keeps its slot until the worker finishes, so the bound
+    stays honest.
+  • A worker that dies (OOM on a hostile file) breaks the pool — it is
+    rebuilt on the next submit.
+
+Workers receive raw bytes (file objects don't cross processes) and
+return encoded JPEGs only. Each server process owns its own pool.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+import metrics
+from images import PreparedImage, preprocess_image
+
+
+class PoolBusy(RuntimeError):
+    """Every worker and queue slot is taken."""
+
+
+_executor: Executor | None = None
+_in_flight = 0
+_lock = threading.Lock()     # done-callbacks run on the pool's thread
+
+
+def _pool() -> Executor:
+    global _executor
+    if _executor is None:
+        if config.IMAGE_WORKERS > 0:
+            # spawn, not fork: the parent has live HTTP client threads
+            _executor = ProcessPoolExecutor(
+                max_workers=config.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bloom-image")
+        metrics.gauge("image_pool.workers", max(config.IMAGE_WORKERS, 1))
+        metrics.gauge("image_pool.capacity", _capacity())
+    return _executor
+
+
+def _capacity() -> int:
+    return max(config.IMAGE_WORKERS, 1) + config.IMAGE_QUEUE
+
+
+def _update_gauges() -> None:
+    metrics.gauge("image_pool.in_flight", _in_flight)
+    metrics.gauge("image_pool.queued", max(0, _in_flight - max(config.IMAGE_WORKERS, 1)))
+
+
+def _release(_future=None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+        _update_gauges()
+
+
+async def submit(data: bytes) -> PreparedImage:
+    """Preprocess data in the pool. Raises PoolBusy, TimeoutError or ValueError."""
+    global _in_flight, _executor
+    with _lock:
+        if _in_flight >= _capacity():
+            metrics.incr("image_pool.rejected")
+            raise PoolBusy("Image processing is busy — try again in a moment")
+        _in_flight += 1
+        _update_gauges()
+
+    try:
+        future = _pool().submit(preprocess_image, data)
+    except BrokenProcessPool:
+        _executor = None
+        try:
+            future = _pool().submit(preprocess_image, data)
+        except BaseException:
+            _release()
+            raise
+    future.add_done_callback(_release)
+
+    started = time.perf_counter()
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), config.IMAGE_TIMEOUT)
+    except TimeoutError:
+        metrics.incr("image_pool.timeout")
+        raise TimeoutError(f"Image took longer than {config.IMAGE_TIMEOUT:g}s to process")
+    except BrokenProcessPool:
+        metrics.incr("image_pool.broken")
+        _executor = None
+        raise ValueError("Image worker crashed")
+    finally:
+        metrics.observe("image.preprocess", (time.perf_counter() - started) * 1000)
+
+
+def _ready() -> None:
+    """No-op run in each worker so it imports PIL before the first upload."""
+
+
+def warm() -> None:
+    """Start the workers now rather than on the first photo."""
+    pool = _pool()
+    for _ in range(config.IMAGE_WORKERS):
+        pool.submit(_ready)
+
+
+def shutdown() -> None:
+    """Stop the workers; queued images are cancelled."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,100 @@
+"""
+Bloom — Image Preprocessing
+============================
+Turns whatever the phone uploaded into a compact JPEG before any
+model sees it:
+
+  1. Reject anything over the decompressed-pixel cap (header only —
+     nothing is decoded yet)
+  2. JPEG draft mode: let libjpeg decode at a reduced DCT scale
+     instead of inflating all 12 MP and shrinking afterwards
+  3. Apply EXIF orientation, then drop EXIF (location, device) entirely
+  4. Downscale to the max dimension, re-encode at the target quality,
+     stepping quality (then size) down until under the byte cap
+  5. Optionally encode a small thumbnail from the same pixels — the
+     router only needs to see roughly what the photo is
+  6. Take a 64-bit difference hash (dHash) of the oriented pixels, so
+     a re-sent or re-shot photo can be recognised (see photo_cache.py)
+
+The decoded pixels never leave this module: callers get encoded
+bytes only, and the PIL image is dropped as soon as we return.
+
+Pure CPU work — the pipeline runs it off the event loop.
+"""
+
+from dataclasses import dataclass
+from io import BytesIO
+from typing import BinaryIO, Optional
+from PIL import Image, ImageOps
+
+import config
+
+# PIL's own decompression-bomb guard, aligned with ours
+Image.MAX_IMAGE_PIXELS = config.IMAGE_MAX_PIXELS
+
+MIN_QUALITY = 50        # don't trade away more detail than this for bytes
+MIN_DIMENSION = 384     # give up shrinking below this and fail instead
+THUMBNAIL_QUALITY = 70
+
+
+@dataclass
+class PreparedImage:
+    jpeg: bytes                         # full preprocessed image, for specialists
+    thumbnail: Optional[bytes] = None   # low-res copy for routing, if enabled
+    dhash: Optional[int] = None         # perceptual hash, near-identical photos differ by few bits
+
+
+def preprocess_image(data: bytes | BinaryIO) -> PreparedImage:
+    """Raw upload (bytes or file) → capped, EXIF-free RGB JPEG (+ thumbnail). Raises ValueError."""
+    max_dim = config.IMAGE_MAX_DIMENSION
+    source = BytesIO(data) if isinstance(data, bytes) else data
+
+    with Image.open(source) as img:
+        if img.width * img.height > config.IMAGE_MAX_PIXELS:
+            raise ValueError(f"Image is {img.width}x{img.height}, over the pixel limit")
+
+        if img.format == "JPEG":
+            img.draft("RGB", (max_dim, max_dim))
+
+        img = ImageOps.exif_transpose(img).convert("RGB")
+
+    img.thumbnail((max_dim, max_dim), Image.LANCZOS, reducing_gap=2.0)
+
+    thumbnail = None
+    if config.ROUTER_THUMBNAIL_DIMENSION:
+        small = img.copy()
+        small.thumbnail((config.ROUTER_THUMBNAIL_DIMENSION,) * 2, Image.LANCZOS, reducing_gap=2.0)
+        thumbnail = _encode(small, THUMBNAIL_QUALITY)
+
+    return PreparedImage(jpeg=_encode_capped(img), thumbnail=thumbnail, dhash=dhash(img))
+
+
+def dhash(img: Image.Image) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour, on a 9x8 greyscale."""
+    pixels = list(img.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def _encode(img: Image.Image, quality: int) -> bytes:
+    out = BytesIO()
+    # No exif= argument, so nothing from the original is carried over
+    img.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def _encode_capped(img: Image.Image) -> bytes:
+    """Highest quality (then largest size) that fits the byte cap."""
+    while True:
+        for quality in range(config.IMAGE_JPEG_QUALITY, MIN_QUALITY - 1, -10):
+            jpeg = _encode(img, quality)
+            if len(jpeg) <= config.IMAGE_MAX_BYTES:
+                return jpeg
+
+        if max(img.size) * 3 // 4 < MIN_DIMENSION:
+            raise ValueError("Image can't be compressed under the size limit")
+        img = img.resize((img.width * 3 // 4, img.height * 3 // 4), Image.LANCZOS)
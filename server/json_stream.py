@@ -0,0 +1,101 @@
+"""
+Bloom — Incremental JSON Field Parser
+======================================
+Watches a JSON object arrive in chunks and reports each top-level
+field the moment its value closes, so the pipeline can forward
+"title" and "content" long before the closing brace shows up.
+
+Anything before the first "{" (e.g. a ```json fence) is skipped.
+Nested objects/arrays are reported whole, once they close.
+"""
+
+import json
+
+# Scanner states at depth 1 (inside the top-level object)
+_KEY, _IN_KEY, _COLON, _BEFORE_VALUE, _IN_VALUE, _AFTER_VALUE, _END = range(7)
+
+
+class FieldStream:
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._state = _KEY
+        self._in_string = False
+        self._escape = False
+        self._key_start = self._key_end = self._value_start = 0
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """Consume a chunk; return (key, value) for every field completed by it."""
+        self._buf += chunk
+        completed = []
+
+        for i in range(self._pos, len(self._buf)):
+            c = self._buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == _IN_KEY:
+                        self._key_end = i + 1
+                        self._state = _COLON
+                    elif self._depth == 1 and self._state == _IN_VALUE:
+                        self._close(i + 1, completed)
+                continue
+
+            if self._state == _END:
+                break
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == _KEY:
+                    self._key_start = i
+                    self._state = _IN_KEY
+                elif self._depth == 1 and self._state == _BEFORE_VALUE:
+                    self._value_start = i
+                    self._state = _IN_VALUE
+            elif c in "{[":
+                if self._depth == 1 and self._state == _BEFORE_VALUE:
+                    self._value_start = i
+                    self._state = _IN_VALUE
+                if self._depth > 0 or c == "{":
+                    self._depth += 1
+            elif c in "}]":
+                if self._depth == 1:
+                    # Closing the top-level object ends any bare literal
+                    if self._state == _IN_VALUE:
+                        self._close(i, completed)
+                    self._depth = 0
+                    self._state = _END
+                elif self._depth > 1:
+                    self._depth -= 1
+                    if self._depth == 1 and self._state == _IN_VALUE:
+                        self._close(i + 1, completed)
+            elif self._depth == 1:
+                if c == ":" and self._state == _COLON:
+                    self._state = _BEFORE_VALUE
+                elif c == ",":
+                    if self._state == _IN_VALUE:
+                        self._close(i, completed)
+                    self._state = _KEY
+                elif not c.isspace() and self._state == _BEFORE_VALUE:
+                    # Bare literal: number, true, false, null
+                    self._value_start = i
+                    self._state = _IN_VALUE
+
+        self._pos = len(self._buf)
+        return completed
+
+    def _close(self, value_end: int, completed: list) -> None:
+        self._state = _AFTER_VALUE
+        try:
+            key = json.loads(self._buf[self._key_start:self._key_end])
+            value = json.loads(self._buf[self._value_start:value_end])
+        except json.JSONDecodeError:
+            return
+        completed.append((key, value))
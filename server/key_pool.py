@@ -0,0 +1,116 @@
+"""
+Bloom — API Key Pool
+=====================
+Spreads Gemini traffic over several API keys (each may belong to its
+own project) so throughput isn't capped at one key's quota.
+
+Each key keeps its own accounting:
+  • a sliding one-minute window of requests sent, against its
+    requests-per-minute budget
+  • calls currently in flight
+  • a drain deadline — a key answering with a quota error (429) is
+    skipped until then, for Retry-After or an exponential cooldown
+    that doubles with each consecutive quota error
+
+pick() hands out the key with the most headroom left this minute.
+When every key is draining the one that recovers soonest is used
+anyway: its call may still succeed, and the retry layer handles it
+if not.
+
+Keys are only ever named key1, key2, … in logs and metrics.
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import metrics
+
+WINDOW = 60.0               # seconds of request history per key
+DRAIN_BASE = 30.0           # first cooldown after a quota error
+DRAIN_MAX = 600.0
+
+
+class ApiKey:
+
+    def __init__(self, name: str, client: Any, rpm: int):
+        self.name = name
+        self.client = client
+        self.rpm = rpm
+        self.in_flight = 0
+        self.strikes = 0                # consecutive quota errors
+        self.drained_until = 0.0
+        self._sent: deque[float] = deque()
+
+    def headroom(self, now: float) -> float:
+        """Requests left this minute (counting those in flight), as a share of the budget."""
+        while self._sent and self._sent[0] <= now - WINDOW:
+            self._sent.popleft()
+        return (self.rpm - len(self._sent) - self.in_flight) / self.rpm
+
+    def draining(self, now: float) -> bool:
+        return now < self.drained_until
+
+    def drain(self, retry_after: Optional[float]) -> None:
+        self.strikes += 1
+        cooldown = retry_after or min(DRAIN_MAX, DRAIN_BASE * 2 ** (self.strikes - 1))
+        self.drained_until = time.monotonic() + cooldown
+        metrics.incr(f"gemini.key.{self.name}.drained")
+        print(f"   Gemini {self.name} hit its quota — draining for {cooldown:g}s")
+
+
+class KeyPool:
+
+    def __init__(self, keys: list[ApiKey]):
+        self.keys = keys
+        self._gauges()
+
+    def available(self) -> bool:
+        """True while at least one key isn't draining."""
+        now = time.monotonic()
+        return any(not k.draining(now) for k in self.keys)
+
+    def pick(self) -> ApiKey:
+        now = time.monotonic()
+        healthy = [k for k in self.keys if not k.draining(now)]
+        self._gauges()
+        if not healthy:
+            metrics.incr("gemini.key.all_drained")
+            return min(self.keys, key=lambda k: k.drained_until)
+        return max(healthy, key=lambda k: k.headroom(now))
+
+    @contextmanager
+    def use(self, key: ApiKey):
+        """Account one request on key; drain it if Gemini says its quota is spent."""
+        key.in_flight += 1
+        try:
+            yield key.client
+        except Exception as e:
+            if getattr(e, "code", None) == 429:
+                key.drain(retry_after_header(e))
+                self._gauges()
+            raise
+        else:
+            if key.strikes:
+                key.strikes = 0
+                key.drained_until = 0.0
+                self._gauges()
+        finally:
+            key.in_flight -= 1
+            key._sent.append(time.monotonic())
+            metrics.incr(f"gemini.key.{key.name}.calls")
+
+    def _gauges(self) -> None:
+        now = time.monotonic()
+        metrics.gauge("gemini_keys.total", len(self.keys))
+        metrics.gauge("gemini_keys.healthy", sum(not k.draining(now) for k in self.keys))
+
+
+def retry_after_header(e: Exception) -> Optional[float]:
+    """Retry-After seconds from an SDK error's HTTP response, if it sent one."""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,152 @@
+"""
+Bloom — Adaptive Concurrency Limiter
+=====================================
+Caps how many Gemini calls this process has open at once, so a burst
+of users queues briefly instead of tripping the rate limit for all of
+them together.
+
+The cap moves AIMD-style:
+  • additive increase  → +1 per window of fast, successful calls
+    made while the cap was actually in use
+  • multiplicative cut → ×LIMITER_BACKOFF on a 429 or a call slower
+    than LIMITER_LATENCY_TARGET, at most once per cooldown so one
+    bad moment doesn't collapse it to the floor
+
+Calls over the cap wait in a bounded FIFO queue, each for at most
+LIMITER_QUEUE_TIMEOUT. A full queue or an expired wait raises
+Overloaded with a retry_after estimate the client can show the user.
+
+A stream holds its slot until its first chunk arrives — that's when
+Gemini admits (or throttles) the request.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import config
+import metrics
+
+
+class Overloaded(RuntimeError):
+    """No slot free and no room (or time) left to wait for one."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+
+    def __init__(self, initial: int, minimum: int, maximum: int, max_queue: int, queue_timeout: float):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._latency = 1.0             # EWMA of call latency, seconds
+        self._last_cut = 0.0
+        self._gauges()
+
+    def retry_after(self) -> float:
+        """Rough seconds until a request arriving now would get a slot."""
+        backlog = len(self._waiters) + 1
+        return round(min(30.0, max(1.0, backlog / max(self.limit, 1) * self._latency)), 1)
+
+    def saturated(self) -> bool:
+        """True when a new call would be turned away outright."""
+        return config.LIMITER and self.in_flight >= int(self.limit) and len(self._waiters) >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot for the body of the with-block."""
+        if not config.LIMITER:
+            yield
+            return
+        await self._acquire()
+        started = time.monotonic()
+        outcome = None
+        try:
+            yield
+            outcome = "ok"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            outcome = "throttled" if getattr(e, "code", None) == 429 else "error"
+            raise
+        finally:
+            self._release(time.monotonic() - started, outcome)
+
+    async def _acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self._gauges()
+            return
+        if len(self._waiters) >= self.max_queue:
+            metrics.incr("limiter.rejected")
+            raise Overloaded("Bloom is busy right now — please try again shortly", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._gauges()
+        try:
+            # The slot is handed over (in_flight already counted) by _release
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return      # granted in the same tick the wait expired
+            waiter.cancel()
+            metrics.incr("limiter.queue_timeout")
+            raise Overloaded("Bloom is busy right now — please try again shortly", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(0.0, None)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._gauges()
+
+    def _release(self, latency: float, outcome: Optional[str]) -> None:
+        was_full = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+
+        if outcome is not None:
+            self._latency += 0.1 * (latency - self._latency)
+        slow = latency > config.LIMITER_LATENCY_TARGET
+        now = time.monotonic()
+        if outcome == "throttled" or slow:
+            if now - self._last_cut > max(1.0, self._latency):
+                self.limit = max(self.minimum, self.limit * config.LIMITER_BACKOFF)
+                self._last_cut = now
+                metrics.incr("limiter.decrease")
+        elif outcome == "ok" and was_full:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+        # Hand freed slots to the oldest waiters still waiting
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._gauges()
+
+    def _gauges(self) -> None:
+        metrics.gauge("limiter.limit", round(self.limit, 2))
+        metrics.gauge("limiter.in_flight", self.in_flight)
+        metrics.gauge("limiter.queued", len(self._waiters))
+
+
+gemini_limiter = AdaptiveLimiter(
+    config.LIMITER_INITIAL,
+    config.LIMITER_MIN,
+    config.LIMITER_MAX,
+    config.LIMITER_QUEUE,
+    config.LIMITER_QUEUE_TIMEOUT
+)
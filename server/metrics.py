@@ -0,0 +1,72 @@
+"""
+Bloom — Metrics
+================
+In-process counters for the pipeline. Cheap enough to bump on every
+request; server.py exposes a snapshot at GET /metrics.
+
+Counters are per worker process — aggregate across workers upstream.
+"""
+
+from collections import defaultdict
+
+_counters: dict[str, int] = defaultdict(int)
+_timings: dict[str, list[float]] = {}     # name → [count, total_ms, max_ms]
+_gauges: dict[str, float] = {}
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Bump a named counter."""
+    _counters[name] += value
+
+
+def observe(name: str, ms: float) -> None:
+    """Record one latency sample in milliseconds."""
+    t = _timings.setdefault(name, [0, 0.0, 0.0])
+    t[0] += 1
+    t[1] += ms
+    t[2] = max(t[2], ms)
+
+
+def gauge(name: str, value: float) -> None:
+    """Set a point-in-time value (queue depth, pool size)."""
+    _gauges[name] = value
+
+
+def get(name: str) -> int:
+    """Current value of a counter (0 if never bumped)."""
+    return _counters.get(name, 0)
+
+
+def hit_rate(hits: str, misses: str) -> float | None:
+    """hits / (hits + misses), or None before the first sample."""
+    total = get(hits) + get(misses)
+    return round(get(hits) / total, 4) if total else None
+
+
+def snapshot() -> dict:
+    """All counters plus derived rates, JSON-ready."""
+    return {
+        "counters": dict(sorted(_counters.items())),
+        "gauges": dict(sorted(_gauges.items())),
+        "latency_ms": {
+            name: {"count": n, "avg": round(total / n, 1), "max": round(peak, 1)}
+            for name, (n, total, peak) in sorted(_timings.items())
+        },
+        "rates": {
+            "speculative_hit_rate": hit_rate("speculative.hit", "speculative.miss"),
+            "fast_router_hit_rate": hit_rate("fast_router.hit", "fast_router.fallback"),
+            "combined_agreement": hit_rate("combined.agree", "combined.disagree"),
+            "router_cache_hit_rate": hit_rate("cache.router.hit", "cache.router.miss"),
+            "response_cache_hit_rate": hit_rate("cache.response.hit", "cache.response.miss"),
+            "semantic_cache_hit_rate": hit_rate("cache.semantic.hit", "cache.semantic.miss"),
+            "photo_cache_hit_rate": hit_rate("cache.photo.hit", "cache.photo.miss"),
+            "pregenerated_hit_rate": hit_rate("cache.pregenerated.hit", "cache.pregenerated.miss"),
+            "hedge_win_rate": hit_rate("gemini.hedge.won", "gemini.hedge.lost"),
+            "prompt_cached_share": hit_rate("gemini.tokens.cached", "gemini.tokens.uncached"),
+        },
+        # Share of each task's Gemini calls that finished within its SLO
+        "slo": {
+            task: hit_rate(f"slo.{task}.met", f"slo.{task}.missed")
+            for task in sorted({n[4:].rsplit(".", 1)[0] for n in _counters if n.startswith("slo.")})
+        },
+    }
@@ -0,0 +1,99 @@
+"""
+Bloom — Repeat Photo Cache
+===========================
+Parents often send the same photo more than once — a retry after a
+timeout, a re-send after reconnecting, a second shot a moment later.
+Within a user's recent photo analyses for the same task, a new upload
+whose dHash is within PHOTO_CACHE_MAX_DISTANCE bits of a stored one,
+sent with a similar message, gets the stored analysis back instead of
+another multimodal Gemini call.
+
+Strictly per user: the scope is the user_id the app sends in its
+context (a stable per-install id), and a request without one skips
+the cache (profile fields like recovery stage or baby name are shared
+by too many users to stand in for it). Only tasks that declare a
+photo_dedupe_threshold take part.
+
+Messages are compared with the semantic cache's embedding; two empty
+messages (photo sent with no text) count as the same message.
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Optional
+
+import config
+import metrics
+from context import BloomContext
+from semantic_cache import embed, similarity
+from tasks import Task
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+class PhotoCache:
+
+    def __init__(self, max_users: int, max_per_user: int, ttl: float):
+        self.max_users = max_users
+        self.max_per_user = max_per_user
+        self.ttl = ttl
+        # scope → deque of (expires_at, image_hash, vector, value), newest last
+        self._scopes: OrderedDict[str, deque] = OrderedDict()
+
+    def lookup(self, scope: str, image_hash: int, message: str, threshold: float) -> Optional[Any]:
+        vector = embed(message)
+        entries = self._scopes.get(scope)
+        best, best_distance = None, config.PHOTO_CACHE_MAX_DISTANCE + 1
+        if entries:
+            now = time.monotonic()
+            for expires_at, stored_hash, stored, value in entries:
+                if expires_at < now:
+                    continue
+                distance = hamming(image_hash, stored_hash)
+                if distance < best_distance and _same_message(vector, stored, threshold):
+                    best, best_distance = value, distance
+
+        metrics.incr("cache.photo.hit" if best is not None else "cache.photo.miss")
+        if best is not None:
+            self._scopes.move_to_end(scope)
+        return best
+
+    def add(self, scope: str, image_hash: int, message: str, value: Any) -> None:
+        entries = self._scopes.get(scope)
+        if entries is None:
+            entries = self._scopes[scope] = deque(maxlen=self.max_per_user)
+            while len(self._scopes) > self.max_users:
+                self._scopes.popitem(last=False)
+        entries.append((time.monotonic() + self.ttl, image_hash, embed(message), value))
+        self._scopes.move_to_end(scope)
+
+
+def _same_message(a: dict[str, float], b: dict[str, float], threshold: float) -> bool:
+    if not a or not b:
+        return not a and not b
+    return similarity(a, b) >= threshold
+
+
+photo_cache = PhotoCache(
+    config.PHOTO_CACHE_USERS,
+    config.PHOTO_CACHE_PER_USER,
+    config.PHOTO_CACHE_TTL
+)
+
+
+def scope_for(task: Task, context: BloomContext) -> Optional[str]:
+    """Per-user cache scope for an opted-in photo task, or None."""
+    if (
+        not config.PHOTO_CACHE
+        or task.photo_dedupe_threshold is None
+        or context.image_hash is None
+    ):
+        return None
+    user = context.user_context.get("user_id")
+    if not user:
+        metrics.incr("cache.photo.no_user")
+        return None
+    return f"{task.name}|{user}"
@@ -4,25 +4,47 @@ Bloom — Pipeline Orchestrator
 The heart of the agentic system. Owns the execution flow:
 
   1. Build BloomContext from the incoming request
-  2. Run RouterAgent → writes routing decision to context
+  2. Route: a deterministic rule if one matches, the local fast-path
+     router if it's confident, RouterAgent's cached decision for this
+     input, a single route-and-answer call where enabled, else
+     RouterAgent (the hinted pillar's likely specialist speculates in
+     parallel) → writes routing decision to context.
+     While the routing model's circuit breaker is open, routing stays
+     local; a specialist whose own model's breaker is open answers
+     from cache or a curated fallback, marked "degraded"
   3. Look up the task in the registry
   4. Dynamically import and run the specialist agent
   5. Yield SSE events at each stage for real-time iOS feedback
 
 Agents don't know about each other. They don't call each other.
 The pipeline is the only thing that orchestrates them.
+
+The whole flow is a coroutine: agents await Gemini through the async
+client, and CPU-bound image preprocessing runs in a worker pool.
 """
 
 import json
+import math
+import time
 import base64
+import random
+import asyncio
 import importlib
-from io import BytesIO
-from typing import Generator
-from PIL import Image
+from collections import Counter, defaultdict
+from dataclasses import replace
+from typing import AsyncGenerator, BinaryIO
 
+import config
+import metrics
+import fast_router
+import gemini_client
+import image_pool
 from context import BloomContext
-from tasks import get_task
+from limiter import Overloaded, gemini_limiter
+from images import PreparedImage
+from tasks import Task, get_task, get_tasks_for_pillar, match_rule
 from agents.router_agent import RouterAgent
+from agents.combined_agent import RouteAndAnswerAgent
 
 
 # Maps pillar names to their agent module + class for dynamic import.
@@ -40,103 +62,457 @@ def _sse_event(event_type: str, data: dict) -> str:
     return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
 
 
-def run_pipeline(request_body: dict) -> Generator[str, None, None]:
+def _error_event(context: BloomContext) -> str:
+    """
+    The context's error, with retry_after when it was an overload —
+    whole seconds as a string, like every other field of the event.
+    """
+    data = {"error": context.error}
+    if context.retry_after is not None:
+        data["retry_after"] = str(math.ceil(context.retry_after))
+    return _sse_event("error", data)
+
+
+# First guess for each pillar hint before any routes have been observed.
+# Image uploads on body/baby almost always mean the multimodal task.
+SPECULATIVE_DEFAULTS = {
+    ("mind",    False): "general_support",
+    ("body",    False): "recovery_guidance",
+    ("body",    True):  "photo_analysis",
+    ("baby",    False): "general_baby_support",
+    ("baby",    True):  "cue_reading",
+    ("partner", False): "help_suggestion",
+}
+
+# (pillar_hint, has_image) → Counter of routed actions, learned as we go
+_route_counts: dict[tuple[str, bool], Counter] = defaultdict(Counter)
+
+
+def _load_agent(pillar: str):
+    """Import and instantiate the specialist agent for a pillar."""
+    agent_module_path, agent_class_name = SPECIALIST_AGENTS.get(
+        pillar,
+        ("agents.mind_agent", "MindAgent")   # ultimate fallback
+    )
+    module = importlib.import_module(agent_module_path)
+    return getattr(module, agent_class_name)()
+
+
+async def _run_specialist(context: BloomContext) -> None:
+    """Run the specialist for context.routed_pillar against context."""
+    agent = _load_agent(context.routed_pillar)
+    await agent.run(context)
+
+
+def _apply_rule(context: BloomContext) -> bool:
+    """Route via the declarative rule table if a rule matches."""
+    rule = match_rule(context)
+    if rule is None:
+        return False
+
+    metrics.incr("route_rule.hit")
+    metrics.incr(f"route_rule.{rule.name}")
+    context.routed_pillar, context.routed_action = rule.task.split(".", 1)
+    context.router_reasoning = rule.reasoning
+    context.steps_completed.append("rule")
+    return True
+
+
+def _combined_candidates(context: BloomContext) -> list[Task]:
+    """Shortlist for a single route-and-answer call, or [] if not enabled."""
+    if context.has_image or not context.pillar_hint:
+        return []
+    return [
+        t for t in get_tasks_for_pillar(context.pillar_hint)
+        if not t.requires_image
+        and (t.pillar in config.COMBINED_PILLARS or t.name in config.COMBINED_TASKS)
+    ]
+
+
+def _maybe_shadow_route(context: BloomContext) -> None:
+    """
+    For a sampled fraction of combined answers, ask RouterAgent too
+    (in the background) and count whether the two paths agree.
+    """
+    if random.random() >= config.COMBINED_SHADOW_RATE:
+        return
+
+    shadow = replace(context, steps_completed=[], error=None, partial_queue=None)
+    chosen = (context.routed_pillar, context.routed_action)
+
+    async def _compare() -> None:
+        await RouterAgent().run(shadow)
+        if shadow.error:
+            return
+        agreed = (shadow.routed_pillar, shadow.routed_action) == chosen
+        metrics.incr("combined.agree" if agreed else "combined.disagree")
+
+    task = asyncio.create_task(_compare())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _predict_action(pillar_hint: str, has_image: bool) -> str | None:
+    """Most frequently routed action for this hint, else the static default."""
+    seen = _route_counts.get((pillar_hint, has_image))
+    if seen:
+        return seen.most_common(1)[0][0]
+    return SPECULATIVE_DEFAULTS.get((pillar_hint, has_image))
+
+
+def _record_route(context: BloomContext) -> None:
+    """Feed the router's decision back into the speculation predictor."""
+    if context.pillar_hint == context.routed_pillar:
+        _route_counts[(context.pillar_hint, context.has_image)][context.routed_action] += 1
+
+
+def _start_speculation(context: BloomContext):
+    """
+    Kick off the hinted pillar's most likely specialist on a forked
+    context while the router runs. Returns (shadow_context, task) or
+    None when speculation doesn't apply.
     """
-    Main entry point. Called by server.py with the parsed JSON body.
+    if not config.SPECULATIVE_EXECUTION or context.pillar_hint not in SPECIALIST_AGENTS:
+        return None
+
+    action = _predict_action(context.pillar_hint, context.has_image)
+    task = get_task(context.pillar_hint, action) if action else None
+    if task is None or (task.requires_image and not context.has_image):
+        return None
+
+    # Fresh outputs so the shadow run can't leak into the real context
+    shadow = replace(
+        context,
+        routed_pillar=task.pillar,
+        routed_action=task.action,
+        response=None,
+        error=None,
+        steps_completed=[],
+        event_history=[],
+        confidence_log=[],
+        # Own queue: a discarded run's partials must never reach the client
+        partial_queue=asyncio.Queue() if context.partial_queue is not None else None,
+    )
+    spec_task = asyncio.create_task(_run_specialist(shadow))
+    # A discarded run's exception is never awaited — mark it retrieved
+    spec_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return shadow, spec_task
+
+
+def _speculation_matches(speculation, context: BloomContext) -> bool:
+    if not speculation:
+        return False
+    shadow, _ = speculation
+    return (shadow.routed_pillar, shadow.routed_action) == (context.routed_pillar, context.routed_action)
+
+
+def _adopt(shadow: BloomContext, context: BloomContext) -> None:
+    """Copy a speculative run's outputs onto the real context."""
+    context.response = shadow.response
+    context.error = shadow.error
+    context.retry_after = shadow.retry_after
+    context.degraded = shadow.degraded
+    context.steps_completed.extend(shadow.steps_completed)
+    context.confidence_log.extend(shadow.confidence_log)
+    context.pending_confidence, shadow.pending_confidence = shadow.pending_confidence, None
+
+
+def _degrade(context: BloomContext) -> None:
+    """Drop a failed Gemini route and route locally instead."""
+    metrics.incr("pipeline.degraded_midway")
+    context.error = context.retry_after = context.response = None
+    fast_router.guess(context)
+
+
+def _discard(speculation) -> None:
+    """Cancel a speculative run (and its self-rating) nobody adopted."""
+    shadow, spec_task = speculation
+    spec_task.cancel()
+    if shadow.pending_confidence:
+        shadow.pending_confidence.cancel()
+
+
+def _read_image(image_data: str | BinaryIO) -> bytes:
+    """Base64 string or binary upload → raw bytes for the image pool."""
+    if isinstance(image_data, str):
+        return base64.b64decode(image_data)
+    image_data.seek(0)
+    return image_data.read()
+
+
+async def _prepare_image(image_data: str | BinaryIO) -> PreparedImage:
+    """Shrink an upload to a capped JPEG in the image worker pool."""
+    raw = await asyncio.to_thread(_read_image, image_data)
+    prepared = await image_pool.submit(raw)
+    metrics.incr("image.bytes_in", len(raw))
+    metrics.incr("image.bytes_out", len(prepared.jpeg))
+    return prepared
+
+
+def _attach_image(context: BloomContext, prepared: PreparedImage) -> None:
+    """Wrap the encoded image once; every model call reuses these parts."""
+    context.image_part = gemini_client.image_part(prepared.jpeg)
+    context.image_hash = prepared.dhash
+    if prepared.thumbnail:
+        context.router_image_part = gemini_client.image_part(prepared.thumbnail)
+
+
+async def run_pipeline(
+    request_body: dict, image_file: BinaryIO | None = None
+) -> AsyncGenerator[str, None]:
+    """
+    Main entry point. Called by server.py with the parsed JSON body —
+    plus, for binary uploads, the spooled image file (closed here once
+    it's decoded).
     Yields SSE event strings the server streams back to the iOS app.
 
     SSE events fired in order:
       "status"  → "Thinking..." (immediate, before any Gemini call)
       "routed"  → { pillar, action, reasoning } (after router completes)
-      "result"  → the full BloomResponse JSON (after specialist completes)
-      "error"   → { error } if anything fails
+      "partial" → { field, value } per response field as it streams in
+      "reset"   → {} the partials sent so far are void: the streamed
+                  reply failed validation and a curated answer follows
+      "result"  → the full BloomResponse JSON (after specialist completes),
+                  with "degraded": true when Gemini was unavailable
+                  or its reply unusable
+      "confidence" → { agent, action, confidence } (after result, unless log-only)
+      "error"   → { error } if anything fails, plus retry_after (whole
+                  seconds, as a string) when Gemini calls are backed up
     """
 
     # ── Step 0: Build context ──
+    started = time.perf_counter()
     context = BloomContext(
         user_message=request_body.get("message", ""),
         pillar_hint=request_body.get("pillar", None),
         user_context=request_body.get("context", {}),
     )
 
-    # Decode image if present
-    image_data = request_body.get("image_data", None)
+    # Turn the request away now, before any work, if Gemini calls are
+    # already backed up past the limiter's queue
+    if gemini_limiter.saturated():
+        metrics.incr("limiter.shed")
+        if image_file:
+            image_file.close()
+        context.fail(Overloaded("Bloom is busy right now — please try again shortly", gemini_limiter.retry_after()))
+        yield _error_event(context)
+        return
+
+    # Decode image if present. Popped so the base64 string is freed as
+    # soon as it's decoded rather than living as long as the request.
+    image_data = request_body.pop("image_data", None) or image_file
     if image_data:
         try:
-            img_bytes = base64.b64decode(image_data)
-            context.image = Image.open(BytesIO(img_bytes)).convert("RGB")
+            prepared = await _prepare_image(image_data)
+        except image_pool.PoolBusy as e:
+            yield _sse_event("error", {"error": str(e)})
+            return
         except Exception as e:
             yield _sse_event("error", {"error": f"Image decode failed: {e}"})
             return
+        finally:
+            if image_file:
+                image_file.close()
+        del image_data
+        _attach_image(context, prepared)
+
+    if config.STREAMING:
+        context.partial_queue = asyncio.Queue()
 
     # ── Step 1: Status event ──
     yield _sse_event("status", {"message": "Thinking..."})
 
-    # ── Step 2: Run Router ──
-    router = RouterAgent()
-    router.run(context)
+    # ── Step 2: Route — deterministic rules, the local fast path and
+    #    cached router decisions, then either one route-and-answer call
+    #    or RouterAgent (with the hinted specialist speculating alongside).
+    #    Only an uncached route is worth a speculative call ──
+    # With the router model's breaker open, route locally. Only routing
+    # degrades: each specialist checks its own model's breaker
+    router_down = gemini_client.circuit_open(gemini_client.model_for("router"))
+    candidates = []
+    if _apply_rule(context):
+        path = "rule"
+    elif fast_router.route(context):
+        path = "fast_router"
+    elif RouterAgent().from_cache(context):
+        path = "router_cache"
+    elif router_down:
+        fast_router.guess(context)
+        path = "degraded"
+    elif candidates := _combined_candidates(context):
+        path = "combined"
+    else:
+        path = "two_stage"
+    speculation = None
 
-    context.event_history.append({
-    "step": "router",
-    "pillar": context.routed_pillar,
-    "action": context.routed_action,
-    "reasoning": context.router_reasoning
-})
+    try:
+        if path == "combined":
+            await RouteAndAnswerAgent().run(context, candidates)
+            if context.response is None and not context.error:
+                # Model declined every candidate — take the normal route
+                metrics.incr("combined.fallback")
+                path = "two_stage"
+            elif not context.error:
+                metrics.incr("combined.answered")
+                _maybe_shadow_route(context)
 
-    if context.error:
-        yield _sse_event("error", {"error": context.error})
-        return
+        if path == "two_stage":
+            speculation = _start_speculation(context)
+            router = RouterAgent()
+            await router.run(context)
+
+        routing_model = gemini_client.model_for("combined" if path == "combined" else "router")
+        if context.error and gemini_client.circuit_open(routing_model):
+            # The breaker tripped while we were routing — route locally instead
+            _degrade(context)
+            path = "degraded"
+
+        context.event_history.append({
+            "step": "router",
+            "pillar": context.routed_pillar,
+            "action": context.routed_action,
+            "reasoning": context.router_reasoning
+        })
 
-    # ── Step 3: Fire "routed" event ──
-    yield _sse_event("routed", {
-        "pillar":    context.routed_pillar,
-        "action":    context.routed_action,
-        "reasoning": context.router_reasoning,
-    })
-
-    # ── Step 4: Look up task + validate ──
-    task = get_task(context.routed_pillar, context.routed_action)
-    if task is None:
-        # Router picked something invalid — fall back to general support for that pillar
-        context.routed_action = f"general_{'support' if context.routed_pillar != 'baby' else 'baby_support'}"
+        if context.error:
+            yield _error_event(context)
+            return
+
+        # ── Step 3: Fire "routed" event ──
+        yield _sse_event("routed", {
+            "pillar":    context.routed_pillar,
+            "action":    context.routed_action,
+            "reasoning": context.router_reasoning,
+        })
+
+        # ── Step 4: Look up task + validate ──
         task = get_task(context.routed_pillar, context.routed_action)
+        if task is None:
+            # Router picked something invalid — fall back to general support for that pillar
+            context.routed_action = f"general_{'support' if context.routed_pillar != 'baby' else 'baby_support'}"
+            task = get_task(context.routed_pillar, context.routed_action)
 
-    if task and task.requires_image and not context.has_image:
-        # Task needs an image but none was uploaded — fall back
-        fallback_actions = {
-            "body": "recovery_guidance",
-            "baby": "general_baby_support",
-        }
-        context.routed_action = fallback_actions.get(context.routed_pillar, "general_support")
+        if task and task.requires_image and not context.has_image:
+            # Task needs an image but none was uploaded — fall back
+            fallback_actions = {
+                "body": "recovery_guidance",
+                "baby": "general_baby_support",
+            }
+            context.routed_action = fallback_actions.get(context.routed_pillar, "general_support")
 
-    # ── Step 5: Run Specialist ──
-    agent_module_path, agent_class_name = SPECIALIST_AGENTS.get(
-        context.routed_pillar,
-        ("agents.mind_agent", "MindAgent")   # ultimate fallback
-    )
+        if path == "two_stage":
+            _record_route(context)
 
-    context.event_history.append({
-    "step": "specialist",
-    "pillar": context.routed_pillar,
-    "response_summary": (
-        context.response.get("title")
-        if isinstance(context.response, dict)
-        else None
-    )
-})
+        # ── Step 5: Run Specialist (the combined call already answered) ──
+        context.event_history.append({
+            "step": "specialist",
+            "pillar": context.routed_pillar,
+            "response_summary": (
+                context.response.get("title")
+                if isinstance(context.response, dict)
+                else None
+            )
+        })
 
-    try:
-        module = importlib.import_module(agent_module_path)
-        agent_class = getattr(module, agent_class_name)
-        agent = agent_class()
-        agent.run(context)
-    except Exception as e:
-        yield _sse_event("error", {"error": f"Specialist failed: {e}"})
-        return
+        if path != "combined":
+            try:
+                async for event in _specialist_events(context, speculation):
+                    yield event
+            except Exception as e:
+                yield _sse_event("error", {"error": f"Specialist failed: {e}"})
+                return
+    finally:
+        # Discard a speculative run nobody adopted (miss, router error, client gone)
+        if speculation:
+            _discard(speculation)
 
     if context.error:
-        yield _sse_event("error", {"error": context.error})
+        yield _error_event(context)
         return
 
+    metrics.observe(f"pipeline.{path}", (time.perf_counter() - started) * 1000)
+
     # ── Step 6: Fire "result" event ──
-    yield _sse_event("result", context.response or {"error": "No response generated"})
\ No newline at end of file
+    yield _sse_event("result", context.response or {"error": "No response generated"})
+
+    # ── Step 7: Confidence, off the critical path ──
+    if context.pending_confidence is None:
+        # Inline mode: the rating came back with the response itself
+        if config.CONFIDENCE_MODE == "inline" and context.confidence_log \
+                and context.confidence_log[-1]["confidence"] is not None:
+            yield _sse_event("confidence", context.confidence_log[-1])
+    elif config.CONFIDENCE_MODE == "event":
+        entry = await context.pending_confidence
+        if entry:
+            context.confidence_log.append(entry)
+            yield _sse_event("confidence", entry)
+    else:
+        # Log-only: let the rating finish after the stream closes
+        _keep_alive(context.pending_confidence, context)
+
+
+async def _specialist_events(
+    context: BloomContext, speculation
+) -> AsyncGenerator[str, None]:
+    """
+    Run the routed specialist — or adopt the speculative run if it
+    guessed right — forwarding "partial" events while it streams, and
+    a "reset" if the streamed reply was then thrown away.
+    """
+    if _speculation_matches(speculation, context):
+        metrics.incr("speculative.hit")
+        run_context, specialist = speculation
+    else:
+        if speculation:
+            metrics.incr("speculative.miss")
+        run_context, specialist = context, asyncio.create_task(_run_specialist(context))
+
+    streamed = False
+    try:
+        if run_context.partial_queue is not None:
+            async for event in _stream_partials(specialist, run_context.partial_queue):
+                streamed = True
+                yield event
+        await specialist
+    finally:
+        if not specialist.done():
+            specialist.cancel()
+
+    # Partials are sent before the reply is validated; if it failed,
+    # the degraded answer replaces them
+    if streamed and run_context.degraded:
+        metrics.incr("stream.reset")
+        yield _sse_event("reset", {})
+
+    if run_context is not context:
+        _adopt(run_context, context)
+
+
+async def _stream_partials(
+    specialist: asyncio.Task, queue: asyncio.Queue
+) -> AsyncGenerator[str, None]:
+    """Forward streamed fields as "partial" events until the specialist finishes."""
+    while not specialist.done():
+        getter = asyncio.ensure_future(queue.get())
+        await asyncio.wait({getter, specialist}, return_when=asyncio.FIRST_COMPLETED)
+        if getter.done():
+            yield _sse_event("partial", getter.result())
+        else:
+            getter.cancel()
+
+    while not queue.empty():
+        yield _sse_event("partial", queue.get_nowait())
+
+
+# Strong refs for log-only confidence tasks that outlive their request
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _keep_alive(task: asyncio.Task, context: BloomContext) -> None:
+    def _done(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.result():
+            context.confidence_log.append(t.result())
+
+    _background_tasks.add(task)
+    task.add_done_callback(_done)
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Bloom — Pre-generated Response Library
+=======================================
+Some tasks give answers that depend only on a handful of profile
+values with a small set of options: the breathing exercise on the
+latest mood, exercise advice on recovery stage and delivery type. For
+those, every combination is rendered ahead of time by an offline job
+and shipped as a compact artifact, so a plain "I need to breathe"
+never has to wait on Gemini.
+
+  build   → python pregenerated.py [path]
+            renders each opted-in task's specialist prompt for every
+            combination of its Task.pregenerate dimensions (with no
+            message), calls Gemini, writes a gzipped JSON artifact
+  load    → at startup; an entry is kept only while the prompt it was
+            generated from (template, model, generation config)
+            still renders to the same fingerprint, so editing a
+            prompt retires its stale answers without a rebuild
+  lookup  → first cache tier for text-only requests; a message that
+            says more than the task's own keywords (more than
+            PREGENERATED_MAX_EXTRA_WORDS other content words) still
+            goes to Gemini
+"""
+
+import asyncio
+import gzip
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+import config
+import gemini_client
+import metrics
+import schemas
+from cache import normalize_message
+from context import BloomContext
+from prompts import Prompt
+from semantic_cache import STOPWORDS
+from tasks import TASK_REGISTRY, Task
+
+FORMAT_VERSION = 1
+
+# Mood check-in values from the app, grouped the way the answers differ
+MOOD_BUCKETS = {
+    "sad": "low", "lonely": "low",
+    "anxious": "anxious", "overwhelmed": "anxious", "angry": "anxious",
+    "happy": "positive", "calm": "positive", "hopeful": "positive", "grateful": "positive",
+}
+
+# dimension → (the options to enumerate, the option a context falls in,
+#              profile fields that put a synthetic context in that option)
+DIMENSIONS = {
+    "recovery_stage": (
+        ("week_1", "week_2", "weeks_3_6", "weeks_6_plus"),
+        lambda c: c.recovery_stage,
+        lambda v: {"recovery_stage": v},
+    ),
+    "delivery_type": (
+        ("vaginal", "cesarean"),
+        lambda c: c.delivery_type,
+        lambda v: {"delivery_type": v},
+    ),
+    "mood_bucket": (
+        ("low", "anxious", "positive", "none"),
+        lambda c: MOOD_BUCKETS.get(c.mood_history[-1].get("mood"), "none") if c.mood_history else "none",
+        # One representative mood per bucket (first listed above)
+        lambda v: {"mood_history": [{"mood": next(m for m, b in MOOD_BUCKETS.items() if b == v)}]}
+                  if v != "none" else {},
+    ),
+}
+
+# Words that make a request no more specific than asking for the task itself
+GENERIC_WORDS = frozenset("""
+    please help need want give show try something tips tip idea ideas suggest
+    suggestion suggestions today again another new quick little bit one ok okay
+    hi hey thanks thank exercise exercises support advice feeling
+""".split())
+
+
+def _key(task_name: str, combo: dict[str, str]) -> str:
+    return "|".join([task_name] + [f"{d}={combo[d]}" for d in sorted(combo)])
+
+
+def _combos(task: Task):
+    if not task.pregenerate:
+        return
+    options = [DIMENSIONS[d][0] for d in task.pregenerate]
+    for values in itertools.product(*options):
+        yield dict(zip(task.pregenerate, values))
+
+
+def _render(task: Task, combo: dict[str, str]) -> Prompt:
+    """The specialist prompt for a message-less request in this combination."""
+    profile = {}
+    for dimension, value in combo.items():
+        profile.update(DIMENSIONS[dimension][2](value))
+    module = importlib.import_module(task.agent_module)
+    agent = getattr(module, task.agent_class)()
+    return agent.build_prompt(task.action, BloomContext(user_context=profile))
+
+
+def personalized(task: Task, message: str) -> bool:
+    """True when the message asks for more than the task's generic answer."""
+    known = STOPWORDS | GENERIC_WORDS | {
+        w for phrase in task.keywords for w in phrase.replace("'", "").split()
+    }
+    extra = [
+        w for w in normalize_message(message).replace("'", "").split()
+        if w not in known
+    ]
+    return len(extra) > config.PREGENERATED_MAX_EXTRA_WORDS
+
+
+# ── Serving ──
+
+_library: dict[str, str] = {}
+
+
+def load(path: str = config.PREGENERATED_PATH) -> int:
+    """Load the artifact, keeping only entries whose prompt is unchanged."""
+    _library.clear()
+    if not config.PREGENERATED or not os.path.exists(path):
+        return 0
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"   Pre-generated library unreadable ({e}) — skipping")
+        return 0
+    if artifact.get("format") != FORMAT_VERSION:
+        print(f"   Pre-generated library is format {artifact.get('format')}, expected {FORMAT_VERSION} — skipping")
+        return 0
+
+    stale = 0
+    for task in TASK_REGISTRY.values():
+        for combo in _combos(task):
+            key = _key(task.name, combo)
+            entry = artifact["entries"].get(key)
+            if entry is None:
+                continue
+            if entry["prompt"] != gemini_client.request_fingerprint(_render(task, combo), task.name):
+                stale += 1
+                continue
+            _library[key] = entry["raw"]
+
+    metrics.gauge("pregenerated.entries", len(_library))
+    metrics.gauge("pregenerated.stale", stale)
+    print(f"   Pre-generated library: {len(_library)} answers ({stale} stale)")
+    return len(_library)
+
+
+def lookup(task: Task, context: BloomContext) -> Optional[str]:
+    """The pre-generated answer for this request, if it doesn't need a personal one."""
+    if not _library or not task.pregenerate:
+        return None
+    if personalized(task, context.user_message):
+        metrics.incr("cache.pregenerated.personalized")
+        return None
+    combo = {d: DIMENSIONS[d][1](context) for d in task.pregenerate}
+    raw = _library.get(_key(task.name, combo))
+    metrics.incr("cache.pregenerated.hit" if raw is not None else "cache.pregenerated.miss")
+    return raw
+
+
+# ── Offline build ──
+
+async def build(path: str = config.PREGENERATED_PATH, concurrency: int = 4) -> int:
+    """Render and generate every opted-in combination, then write the artifact."""
+    jobs = [
+        (task, combo)
+        for task in TASK_REGISTRY.values()
+        for combo in _combos(task)
+    ]
+    gate = asyncio.Semaphore(concurrency)
+    entries: dict[str, dict] = {}
+
+    async def generate(task: Task, combo: dict[str, str]) -> None:
+        key = _key(task.name, combo)
+        prompt = _render(task, combo)
+        async with gate:
+            try:
+                raw = await gemini_client.call([prompt.tail], task=task.name, system=prompt.system)
+            except RuntimeError as e:
+                print(f"   {key}: failed ({e})")
+                return
+        if schemas.parse(raw, task.name, task.response_schema) is None:
+            # Only ship answers the agent will be able to parse
+            print(f"   {key}: unusable reply — skipped")
+            return
+        entries[key] = {"prompt": gemini_client.request_fingerprint(prompt, task.name), "raw": raw}
+        print(f"   {key}: ok")
+
+    await asyncio.gather(*(generate(task, combo) for task, combo in jobs))
+
+    artifact = {
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "entries": dict(sorted(entries.items())),
+    }
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    print(f"   Wrote {len(entries)}/{len(jobs)} answers to {path}")
+    return len(entries)
+
+
+if __name__ == "__main__":
+    asyncio.run(build(*sys.argv[1:2]))
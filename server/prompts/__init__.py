@@ -0,0 +1,33 @@
+"""
+Bloom — Prompts
+================
+Every builder returns a Prompt in two parts:
+
+  system → the task's instructions and output format. No request
+           values, so it is byte-identical on every call and sent as
+           the system instruction — or, once it (or the shared
+           prefix that holds it, where enabled) is cached, as that
+           cached-content handle (see prompts/shared.py and
+           context_cache.py)
+  tail   → this request's context values and message; the only part
+           sent fresh each time
+
+str(prompt) gives the whole text, for fingerprints. A prompt that
+embeds others' instructions does it with section(), the same block
+the shared prefix is made of (see prompts/shared.py).
+"""
+
+from typing import NamedTuple
+
+
+class Prompt(NamedTuple):
+    system: str
+    tail: str
+
+    def __str__(self) -> str:
+        return f"{self.system}\n\n{self.tail}"
+
+
+def section(name: str, instructions: str) -> str:
+    """One named block of instructions."""
+    return f"=== SECTION: {name} ===\n{instructions}"
@@ -0,0 +1,59 @@
+"""
+Bloom — Route-and-Answer Prompt
+================================
+One prompt that both picks the task and answers it. Carries the
+specialist prompts of a shortlist of tasks (built by the regular
+prompts/* builders): each task's instructions go in the fixed part,
+as the same sections the shared prefix is made of, and its context
+values in the tail. The shortlist only depends on the pillar hint,
+so the fixed part repeats across requests like any other.
+"""
+
+from prompts import Prompt, section
+
+
+COMBINED = """You are Bloom — the routing and response layer of a postpartum support system.
+
+In a single step you must:
+  1. Pick the ONE candidate task that best fits the user's message and context.
+  2. Answer it, following that task's own SECTION of these instructions exactly, with the context given for it.
+
+If none of the candidate tasks fit the message, pick "none" and leave "response" null.
+
+OUTPUT FORMAT:
+Respond with ONLY a JSON object. Do NOT include markdown, explanations, or extra text.
+
+{
+  "task": "<exact task name from the candidates, or none>",
+  "reasoning": "One concise sentence explaining why this task is the best next step.",
+  "response": <the JSON object the chosen task's SECTION asks for>
+}
+
+The user's message, the pillar hint and the candidate tasks with their context follow."""
+
+
+def combined_system(candidates: list[tuple[str, str]]) -> str:
+    """The framing plus each candidate's (task name, instructions) section."""
+    return "\n\n".join([COMBINED, *(section(name, system) for name, system in candidates)])
+
+
+def build_combined_prompt(
+    user_message: str,
+    pillar_hint: str,
+    candidates: list[tuple[str, str, Prompt]]
+) -> Prompt:
+    """candidates: (task name, description, specialist prompt) per task."""
+    tasks = "\n\n".join(
+        f"=== TASK: {name} ===\nWHEN TO PICK IT: {description}\nITS CONTEXT:\n{prompt.tail}"
+        for name, description, prompt in candidates
+    )
+
+    return Prompt(combined_system([(name, prompt.system) for name, _, prompt in candidates]), f"""USER MESSAGE:
+{user_message}
+
+PILLAR HINT FROM UI:
+{pillar_hint}
+
+CANDIDATE TASKS:
+
+{tasks}""")
@@ -0,0 +1,26 @@
+"""
+Bloom — Confidence Prompts
+===========================
+Self-rating instructions shared by every specialist. Either asked
+as a follow-up call (background mode) or folded into the main
+response as an extra JSON field (inline mode).
+"""
+
+from prompts import Prompt
+
+
+RATING_PROMPT = (
+    "Briefly rate your confidence in this response from 0–1 "
+    "and say what information would change your decision."
+)
+
+
+def with_inline_confidence(prompt: Prompt) -> Prompt:
+    """Ask for the self-rating as a field of the main JSON response."""
+    return prompt._replace(system=f"""{prompt.system}
+
+Also include a top-level "confidence" key in that same JSON object:
+  "confidence": {{
+    "score": <number from 0 to 1 — how confident you are in this response>,
+    "would_change": "One short sentence on what information would change your answer."
+  }}""")
@@ -4,22 +4,13 @@ Bloom — Partner Specialist Prompts
 The differentiator. Every prompt pulls from the FULL context —
 mom's mood, recovery stage, baby's state — so the partner gets
 specific, actionable suggestions, not generic advice.
+Each returns a Prompt: fixed instructions, then the per-request tail.
 """
 
+from prompts import Prompt
 
-def help_suggestion(user_message: str, context: dict) -> str:
-    mood_history = context.get("mood_history", [])
-    baby_data    = context.get("baby_data", {})
-    baby_name    = context.get("baby_name", "baby")
-    recovery     = context.get("recovery_stage", "unknown")
-    delivery     = context.get("delivery_type", "unknown")
 
-    recent_mood  = mood_history[-1].get("mood", "unknown") if mood_history else "unknown"
-    mood_note    = mood_history[-1].get("note", "") if mood_history else ""
-    last_feed    = baby_data.get("last_feed_time", "unknown")
-    sleep_status = baby_data.get("sleep_status", "unknown")
-
-    return f"""You are Bloom's Partner Agent — a context-aware planning assistant for postpartum partners.
+HELP_SUGGESTION = """You are Bloom's Partner Agent — a context-aware planning assistant for postpartum partners.
 
 This is an ongoing support system. Your task is to decide the SINGLE most helpful
 action the partner can take RIGHT NOW, based on the current household state and
@@ -28,17 +19,6 @@ recent emotional and physical context.
 You must be specific. Avoid generic advice. Choose an action that meaningfully
 reduces load on the mother or improves wellbeing in the next 30–60 minutes.
 
-CURRENT CONTEXT SNAPSHOT:
-  Mom's most recent mood: {recent_mood}
-  Mom's mood note: "{mood_note}"
-  Mom's recovery stage: {recovery}
-  Delivery type: {delivery}
-  {baby_name}'s last feed: {last_feed}
-  {baby_name}'s sleep status: {sleep_status}
-
-PARTNER MESSAGE:
-{user_message}
-
 PLANNING GUIDELINES:
 - If mom's mood is low, prioritize emotional relief or rest.
 - If physical recovery is ongoing, reduce physical strain.
@@ -46,7 +26,7 @@ PLANNING GUIDELINES:
 - Choose actions that help immediately, not eventually.
 
 Respond with ONLY a JSON object:
-{{
+{
   "title": "What you can do right now",
   "content": "2–3 sentences explaining the action and why it helps in this moment.",
   "suggestion": "An optional second small action if appropriate.",
@@ -54,15 +34,36 @@ Respond with ONLY a JSON object:
     "Primary action the partner should take now",
     "Secondary action if relevant"
   ]
-}}"""
+}
+
+The current context snapshot and the partner's message follow."""
 
 
-def emotional_support(user_message: str, context: dict) -> str:
+def help_suggestion(user_message: str, context: dict) -> Prompt:
     mood_history = context.get("mood_history", [])
-    recent_moods = [e.get("mood", "?") for e in mood_history[-3:]]
+    baby_data    = context.get("baby_data", {})
     baby_name    = context.get("baby_name", "baby")
+    recovery     = context.get("recovery_stage", "unknown")
+    delivery     = context.get("delivery_type", "unknown")
+
+    recent_mood  = mood_history[-1].get("mood", "unknown") if mood_history else "unknown"
+    mood_note    = mood_history[-1].get("note", "") if mood_history else ""
+    last_feed    = baby_data.get("last_feed_time", "unknown")
+    sleep_status = baby_data.get("sleep_status", "unknown")
+
+    return Prompt(HELP_SUGGESTION, f"""CURRENT CONTEXT SNAPSHOT:
+  Mom's most recent mood: {recent_mood}
+  Mom's mood note: "{mood_note}"
+  Mom's recovery stage: {recovery}
+  Delivery type: {delivery}
+  {baby_name}'s last feed: {last_feed}
+  {baby_name}'s sleep status: {sleep_status}
+
+PARTNER MESSAGE:
+{user_message}""")
+
 
-    return f"""You are Bloom's Partner Agent — responsible for guiding emotional support
+EMOTIONAL_SUPPORT = """You are Bloom's Partner Agent — responsible for guiding emotional support
 during the postpartum period.
 
 Your role is to help the partner respond to the mother's emotional state in a way
@@ -70,12 +71,6 @@ that is validating, grounding, and supportive over time — not to fix or minimi
 
 You are operating within an ongoing emotional context, not a single moment.
 
-RECENT MOOD TREND (most recent last): {recent_moods if recent_moods else ['unknown']}
-BABY'S NAME: {baby_name}
-
-PARTNER MESSAGE:
-{user_message}
-
 GUIDANCE PRINCIPLES:
 - Listening is more important than solutions.
 - Emotional validation reduces isolation.
@@ -83,7 +78,7 @@ GUIDANCE PRINCIPLES:
 - If mood has been persistently low, normalize seeking professional support.
 
 Respond with ONLY a JSON object:
-{{
+{
   "title": "Supporting her emotionally",
   "content": "2–3 warm, specific sentences describing how to support her emotionally right now.",
   "suggestion": "One concrete thing the partner can do in the next hour.",
@@ -91,37 +86,37 @@ Respond with ONLY a JSON object:
     "Specific supportive action",
     "Optional second action if relevant"
   ]
-}}"""
+}
 
+The recent mood trend and the partner's message follow."""
 
-def feeding_help(user_message: str, context: dict) -> str:
-    baby_name = context.get("baby_name", "baby")
-    baby_data = context.get("baby_data", {})
-    last_feed = baby_data.get("last_feed_time", "unknown")
-    duration  = baby_data.get("feed_duration_minutes", "unknown")
 
-    return f"""You are Bloom's Partner Agent — helping coordinate baby care in a way
+def emotional_support(user_message: str, context: dict) -> Prompt:
+    mood_history = context.get("mood_history", [])
+    recent_moods = [e.get("mood", "?") for e in mood_history[-3:]]
+    baby_name    = context.get("baby_name", "baby")
+
+    return Prompt(EMOTIONAL_SUPPORT, f"""RECENT MOOD TREND (most recent last): {recent_moods if recent_moods else ['unknown']}
+BABY'S NAME: {baby_name}
+
+PARTNER MESSAGE:
+{user_message}""")
+
+
+FEEDING_HELP = """You are Bloom's Partner Agent — helping coordinate baby care in a way
 that reduces mental and physical load on the mother.
 
 Feeding is a high-effort, high-frequency task. Your goal is to identify specific
 ways the partner can meaningfully contribute right now, based on recent feeding activity.
 
-BABY CONTEXT:
-  Baby's name: {baby_name}
-  Last feed time: {last_feed}
-  Feed duration: {duration} minutes
-
-PARTNER MESSAGE:
-{user_message}
-
 PLANNING GUIDELINES:
 - Reduce the number of decisions mom has to make.
 - Take ownership of prep, cleanup, or tracking when possible.
 - Prioritize actions that allow mom to rest or disengage briefly.
 
 Respond with ONLY a JSON object:
-{{
-  "title": "How to help with {baby_name}",
+{
+  "title": "How to help with <baby's name>",
   "content": "2–3 sentences tailored to the current feeding situation.",
   "suggestion": "One thing the partner can do immediately.",
   "partnerActions": [
@@ -129,27 +124,34 @@ Respond with ONLY a JSON object:
     "Secondary action",
     "Optional third action if relevant"
   ]
-}}"""
+}
 
+The baby's context and the partner's message follow."""
 
-def general_partner_support(user_message: str, context: dict) -> str:
-    recovery  = context.get("recovery_stage", "unknown")
+
+def feeding_help(user_message: str, context: dict) -> Prompt:
     baby_name = context.get("baby_name", "baby")
+    baby_data = context.get("baby_data", {})
+    last_feed = baby_data.get("last_feed_time", "unknown")
+    duration  = baby_data.get("feed_duration_minutes", "unknown")
+
+    return Prompt(FEEDING_HELP, f"""BABY CONTEXT:
+  Baby's name: {baby_name}
+  Last feed time: {last_feed}
+  Feed duration: {duration} minutes
 
-    return f"""You are Bloom's Partner Agent — supporting partners who may feel unsure,
+PARTNER MESSAGE:
+{user_message}""")
+
+
+GENERAL_PARTNER_SUPPORT = """You are Bloom's Partner Agent — supporting partners who may feel unsure,
 overwhelmed, or uncertain about what to do next during the postpartum period.
 
 Your goal is to normalize uncertainty while giving the partner a clear, concrete
 direction they can act on immediately.
 
-MOM'S RECOVERY STAGE: {recovery}
-BABY'S NAME: {baby_name}
-
-PARTNER MESSAGE:
-{user_message}
-
 Respond with ONLY a JSON object:
-{{
+{
   "title": "You're doing more than you think",
   "content": "2–3 encouraging, specific sentences that ground the partner and clarify their role.",
   "suggestion": "One actionable next step they can take today.",
@@ -157,4 +159,17 @@ Respond with ONLY a JSON object:
     "Action the partner can take now",
     "Optional second action if relevant"
   ]
-}}"""
+}
+
+The household context and the partner's message follow."""
+
+
+def general_partner_support(user_message: str, context: dict) -> Prompt:
+    recovery  = context.get("recovery_stage", "unknown")
+    baby_name = context.get("baby_name", "baby")
+
+    return Prompt(GENERAL_PARTNER_SUPPORT, f"""MOM'S RECOVERY STAGE: {recovery}
+BABY'S NAME: {baby_name}
+
+PARTNER MESSAGE:
+{user_message}""")
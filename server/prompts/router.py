@@ -2,16 +2,18 @@
 Bloom — Router Prompt
 =====================
 The prompt for the Router agent. Injected with the live task
-registry so it always knows exactly what tasks exist.
+registry so it always knows exactly what tasks exist. The task list
+only changes with the registry, so it lives in the fixed part of the
+Prompt; the message, hint and context snapshot make up the tail.
 """
 
+from functools import lru_cache
 
-def build_router_prompt(
-    user_message: str,
-    pillar_hint: str,
-    context_json: str,
-    available_tasks: list[str]
-) -> str:
+from prompts import Prompt
+
+
+@lru_cache(maxsize=8)
+def _router_system(available_tasks: tuple[str, ...]) -> str:
     tasks_list = "\n".join(f"  - {t}" for t in available_tasks)
 
     return f"""You are the Bloom Router — the planning and decision layer of a postpartum support system called Bloom.
@@ -28,15 +30,6 @@ Your responsibility:
 Determine the SINGLE best next task to execute, based on the user's message AND the recent context history.
 You are selecting the next action in an ongoing support process — not merely classifying the message.
 
-USER MESSAGE:
-{user_message}
-
-PILLAR HINT FROM UI (may be "none"):
-{pillar_hint}
-
-CURRENT CONTEXT SNAPSHOT (includes recent events and state history):
-{context_json}
-
 AVAILABLE TASKS (pick EXACTLY one):
 {tasks_list}
 
@@ -59,4 +52,21 @@ Respond with ONLY a JSON object. Do NOT include markdown, explanations, or extra
   "task": "<exact task name from the list above>",
   "reasoning": "One concise sentence explaining why this task is the best next step given the recent context."
 }}
-"""
+
+The user's message, the pillar hint and the context snapshot follow."""
+
+
+def build_router_prompt(
+    user_message: str,
+    pillar_hint: str,
+    context_json: str,
+    available_tasks: list[str]
+) -> Prompt:
+    return Prompt(_router_system(tuple(available_tasks)), f"""USER MESSAGE:
+{user_message}
+
+PILLAR HINT FROM UI (may be "none"):
+{pillar_hint}
+
+CURRENT CONTEXT SNAPSHOT (includes recent events and state history):
+{context_json}""")
@@ -0,0 +1,86 @@
+"""
+Bloom — Shared Prompt Prefix
+=============================
+One fixed prefix for every call: the fixed part (Prompt.system) of
+the router, the route-and-answer call and every specialist task, each
+under its own section. A request opens by naming its section, then
+sends its usual tail:
+
+  SECTION: baby.sleep_guidance
+  BABY CONTEXT: ...
+
+Any one section is a few hundred tokens — below the minimum Gemini
+will cache — but together they run to a few thousand, so a single
+context-cache handle per key and model (see context_cache.py) serves
+every call, and each call's fresh prompt tokens are just its tail.
+
+Sections are rendered the way each caller renders its own prompt
+(inline confidence included), and gemini_client only swaps a prompt's
+system for the prefix when the prefix holds exactly that text: the
+label's own section, followed by any sections it carries along (the
+route-and-answer prompt brings its candidates'). Until the prefix is
+cached — or while CONTEXT_CACHE is off — every prompt is sent with
+its own instructions as before, so a missing handle never costs the
+whole prefix inline.
+
+Off unless CONTEXT_CACHE_SHARED_PREFIX is set: the other sections
+(the router's JSON rules among them) sit in front of every answer,
+and that has yet to be checked for its effect on answer quality.
+"""
+
+import importlib
+import re
+from functools import lru_cache
+
+import config
+from context import BloomContext
+from prompts import section
+from prompts.combined import COMBINED
+from prompts.router import build_router_prompt
+from tasks import TASK_REGISTRY, all_task_names
+
+HEADER = """You are Bloom, a postpartum support system. Below are the instructions for every part Bloom plays, one section each.
+
+Every request begins with "SECTION: <name>", naming the ONE section that applies. Follow that section — its role, its rules and its output format — as if it were your only instructions, and ignore every other section unless it tells you to use one."""
+
+_SECTION_LINE = re.compile(r"^=== SECTION: (\S+) ===$", re.MULTILINE)
+
+
+@lru_cache(maxsize=1)
+def sections() -> dict[str, str]:
+    """Section name (the call's task label) → that call's fixed instructions."""
+    found = {
+        "router": build_router_prompt("", "", "", all_task_names()).system,
+        "combined": COMBINED,
+    }
+    for name, task in TASK_REGISTRY.items():
+        module = importlib.import_module(task.agent_module)
+        agent = getattr(module, task.agent_class)()
+        found[name] = agent.build_prompt(task.action, BloomContext()).system
+    return found
+
+
+@lru_cache(maxsize=1)
+def prefix() -> str:
+    return "\n\n".join([HEADER, *(section(name, text) for name, text in sections().items())])
+
+
+def holds(label: str, system: str) -> bool:
+    """True when calls labelled label can send the shared prefix instead of system."""
+    if not (config.CONTEXT_CACHE and config.CONTEXT_CACHE_SHARED_PREFIX):
+        return False
+    known = sections()
+    own = known.get(label)
+    if own is None:
+        return False
+    if system == own:
+        return True
+    carried = _SECTION_LINE.findall(system)
+    return bool(carried) and all(name in known for name in carried) and system == "\n\n".join(
+        [own, *(section(name, known[name]) for name in carried)]
+    )
+
+
+def opener(label: str) -> str:
+    """The first line of a request that follows section label."""
+    return f"SECTION: {label}"
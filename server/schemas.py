@@ -0,0 +1,218 @@
+"""
+Bloom — Response Schemas & Parser
+==================================
+Every JSON-answering call asks Gemini for structured output: the
+config carries response_mime_type="application/json" and the task's
+schema (Task.response_schema; the router and route-and-answer calls
+have their own below), so replies come back as bare JSON in the
+field order the app streams — no markdown fences to strip.
+
+All replies are read by parse(), one shared validator on orjson:
+
+  clean    → parsed as-is, required fields present
+  repaired → a cheap fix-up made it parse: text around the object
+             dropped, trailing commas removed, a reply cut off at
+             max_output_tokens closed off
+  failed   → nothing usable; the caller falls back (curated answer,
+             default route) instead of showing raw model text
+
+Outcomes are counted per task as parse.{task}.clean/repaired/failed.
+"""
+
+import re
+from typing import Optional
+
+import orjson
+
+import config
+import metrics
+
+# ── Field types ──
+_TEXT = {"type": "string"}
+_OPTIONAL_TEXT = {"type": "string", "nullable": True}
+_STEPS = {"type": "array", "items": _TEXT, "nullable": True}
+
+
+def _object(required: tuple[str, ...] = (), nullable: bool = False, **properties) -> dict:
+    schema = {
+        "type": "object",
+        "properties": properties,
+        "required": list(required),
+        "propertyOrdering": list(properties),
+    }
+    if nullable:
+        schema["nullable"] = True
+    return schema
+
+
+def _answer(**extra) -> dict:
+    """A BloomResponse: title, content, suggestion, plus the pillar's own fields."""
+    return _object(
+        ("title", "content"),
+        title=_TEXT,
+        content=_TEXT,
+        suggestion=_OPTIONAL_TEXT,
+        **extra,
+    )
+
+
+BREATHING = _object(
+    ("name", "inhaleSecs", "holdSecs", "exhaleSecs", "rounds"),
+    name=_TEXT,
+    inhaleSecs={"type": "integer"},
+    holdSecs={"type": "integer"},
+    exhaleSecs={"type": "integer"},
+    rounds={"type": "integer"},
+)
+
+BABY_READOUT = _object(
+    ("likely_state", "confidence", "guidance"),
+    nullable=True,
+    likely_state={"type": "string", "enum": [
+        "hungry", "tired", "comfortable", "fussy", "overstimulated", "needs_change",
+    ]},
+    confidence={"type": "string", "enum": ["high", "medium", "low"]},
+    guidance=_TEXT,
+)
+
+# ── Specialist answers (referenced from tasks.py) ──
+MIND = _answer(moodInsight=_OPTIONAL_TEXT)
+MIND_BREATHING = _answer(breathing=BREATHING)
+BODY = _answer(exerciseSteps=_STEPS)
+BABY = _answer(babyReadout=BABY_READOUT)
+PARTNER = _answer(partnerActions=_STEPS)
+
+# Superset of every specialist's fields, for the route-and-answer call
+ANY_ANSWER = _answer(
+    moodInsight=_OPTIONAL_TEXT,
+    breathing={**BREATHING, "nullable": True},
+    exerciseSteps=_STEPS,
+    babyReadout=BABY_READOUT,
+    partnerActions=_STEPS,
+)
+
+# Inline-mode self-rating, appended to answers (see prompts/confidence.py)
+CONFIDENCE = _object(
+    ("score",),
+    score={"type": "number"},
+    would_change=_OPTIONAL_TEXT,
+)
+
+
+def with_confidence(schema: dict) -> dict:
+    """schema plus the inline "confidence" field, when that mode is on."""
+    if config.CONFIDENCE_MODE != "inline":
+        return schema
+    return _object(
+        tuple(schema["required"]) + ("confidence",),
+        nullable=schema.get("nullable", False),
+        **schema["properties"],
+        confidence=CONFIDENCE,
+    )
+
+
+def router_schema(task_names: list[str]) -> dict:
+    return _object(
+        ("task", "reasoning"),
+        task={"type": "string", "enum": task_names},
+        reasoning=_TEXT,
+    )
+
+
+def combined_schema(task_names: list[str]) -> dict:
+    return _object(
+        ("task", "reasoning"),
+        task={"type": "string", "enum": task_names + ["none"]},
+        reasoning=_TEXT,
+        response={**with_confidence(ANY_ANSWER), "nullable": True},
+    )
+
+
+# ── Parsing ──
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _repair(raw: str) -> str:
+    """Best-effort fix-up of an almost-JSON reply."""
+    text = _FENCE.sub("", raw)
+    start = text.find("{")
+    if start < 0:
+        return text
+    end = text.rfind("}")
+    text = text[start:end + 1] if end > start and _balanced(text[start:end + 1]) else text[start:]
+    text = _TRAILING_COMMA.sub(r"\1", text)
+    return _close(text)
+
+
+def _balanced(text: str) -> bool:
+    return not _open_brackets(text)[0]
+
+
+def _open_brackets(text: str) -> tuple[list[str], bool]:
+    """Brackets still open at the end of text, and whether a string is."""
+    stack, in_string, escape = [], False, False
+    for c in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]" and stack:
+            stack.pop()
+    return stack, in_string
+
+
+def _close(text: str) -> str:
+    """Close a reply that was cut off mid-object."""
+    stack, in_string = _open_brackets(text)
+    if not stack:
+        return text
+    if in_string:
+        text += '"'
+    if stack[-1] == "}":
+        # A key whose value never arrived can't be completed — drop it
+        text = re.sub(r'([{,])\s*"[^"]*"\s*:?\s*$', r"\1", text)
+    text = re.sub(r"[,:]\s*$", "", text.rstrip())
+    return text + "".join(reversed(stack))
+
+
+def _valid(value, schema: Optional[dict]) -> bool:
+    if not isinstance(value, dict):
+        return False
+    if schema is None:
+        return True
+    return all(value.get(field) is not None for field in schema["required"])
+
+
+def parse(raw: str, label: str, schema: Optional[dict] = None) -> Optional[dict]:
+    """
+    The reply as a dict — repaired if need be — or None if it can't be
+    used. schema's required fields must be present.
+    """
+    try:
+        value = orjson.loads(raw)
+        if _valid(value, schema):
+            metrics.incr(f"parse.{label}.clean")
+            return value
+    except orjson.JSONDecodeError:
+        pass
+
+    try:
+        value = orjson.loads(_repair(raw))
+        if _valid(value, schema):
+            metrics.incr(f"parse.{label}.repaired")
+            return value
+    except orjson.JSONDecodeError:
+        pass
+
+    metrics.incr(f"parse.{label}.failed")
+    print(f"   Unusable {label} reply: {raw[:120]!r}")
+    return None
@@ -0,0 +1,125 @@
+"""
+Bloom — Semantic Answer Cache
+==============================
+Cross-user reuse for generic tasks. A new question that is close
+enough to one answered before — same task, same values for the few
+context fields that task's prompt actually uses — gets the stored
+answer instead of a Gemini call.
+
+Strictly opt-in: only tasks that declare a semantic_threshold are
+ever looked up or stored, so personalized tasks can't be served
+someone else's answer.
+
+Vectors are sparse bags of words, word bigrams and character
+trigrams over the normalized message, compared by cosine similarity.
+Each scope holds a bounded, recency-ordered list, so a lookup is a
+short linear scan — no external index needed at this size.
+"""
+
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Optional
+
+import config
+import metrics
+from cache import normalize_message, fingerprint
+from context import BloomContext
+from tasks import Task
+
+# Context fields a task may scope on — must cover everything its prompt reads
+SCOPE_FIELDS = {
+    "recovery_stage": lambda c: c.recovery_stage,
+    "delivery_type":  lambda c: c.delivery_type,
+    "baby_name":      lambda c: c.baby_name,
+    "user_role":      lambda c: c.user_role,
+    "latest_mood":    lambda c: c.mood_history[-1].get("mood") if c.mood_history else None,
+}
+
+
+# Function words carry no meaning for matching and inflate overlap
+STOPWORDS = frozenset("""
+    a an the and or but so if to of in on at for with about is are was were be been am
+    i im me my we our you your she her he him his it its they them this that these those
+    do does did can cant could should would will just really very how what when why
+    all any some so have has had there right now
+""".split())
+
+
+def embed(message: str) -> dict[str, float]:
+    """L2-normalized sparse vector for a message (empty dict if no text)."""
+    words = [
+        w for w in normalize_message(message).replace("'", "").split()
+        if w not in STOPWORDS
+    ]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            features[padded[i:i + 3]] += 0.5
+
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    return {k: v / norm for k, v in features.items()} if norm else {}
+
+
+def similarity(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of two embed() vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class SemanticCache:
+
+    def __init__(self, max_scopes: int, max_per_scope: int, ttl: float):
+        self.max_scopes = max_scopes
+        self.max_per_scope = max_per_scope
+        self.ttl = ttl
+        # scope → deque of (expires_at, vector, value), newest last
+        self._scopes: OrderedDict[str, deque] = OrderedDict()
+
+    def lookup(self, scope: str, message: str, threshold: float) -> Optional[Any]:
+        vector = embed(message)
+        entries = self._scopes.get(scope)
+        best, best_score = None, threshold
+        if vector and entries:
+            now = time.monotonic()
+            for expires_at, stored, value in entries:
+                if expires_at < now:
+                    continue
+                score = similarity(vector, stored)
+                if score >= best_score:
+                    best, best_score = value, score
+
+        metrics.incr("cache.semantic.hit" if best is not None else "cache.semantic.miss")
+        if best is not None:
+            self._scopes.move_to_end(scope)
+        return best
+
+    def add(self, scope: str, message: str, value: Any) -> None:
+        vector = embed(message)
+        if not vector:
+            return
+        entries = self._scopes.get(scope)
+        if entries is None:
+            entries = self._scopes[scope] = deque(maxlen=self.max_per_scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+        entries.append((time.monotonic() + self.ttl, vector, value))
+        self._scopes.move_to_end(scope)
+
+
+semantic_cache = SemanticCache(
+    config.SEMANTIC_CACHE_SCOPES,
+    config.SEMANTIC_CACHE_PER_SCOPE,
+    config.SEMANTIC_CACHE_TTL
+)
+
+
+def scope_for(task: Task, context: BloomContext) -> Optional[str]:
+    """Cache scope for an opted-in task, or None if the task isn't opted in."""
+    if not config.SEMANTIC_CACHE or task.semantic_threshold is None:
+        return None
+    values = {name: SCOPE_FIELDS[name](context) for name in task.semantic_scope}
+    return f"{task.name}|{fingerprint(values)}"
@@ -1,6 +1,6 @@
 """
-Bloom — Flask Server
-=====================
+Bloom — ASGI Server
+====================
 Thin HTTP layer. Receives requests, hands them to the pipeline,
 streams the pipeline's SSE output back to the client.
 
@@ -12,30 +12,74 @@ SETUP:
          GEMINI_API_KEY=your_key_here
 
   2. Install dependencies:
-         pip install flask flask-cors google-genai python-dotenv Pillow
+         pip install -r requirements.txt
 
   3. Run:
          python server.py
+     or, with several worker processes:
+         uvicorn server:app --host 0.0.0.0 --port 8080 --workers 4
 
   Listens on http://0.0.0.0:8080
+
+The app is async end to end: while a request waits on Gemini it
+holds no thread, so one worker can keep hundreds of streams open.
 """
 
-from flask import Flask, request, Response, jsonify
-from flask_cors import CORS
+import json
+import shutil
+from tempfile import SpooledTemporaryFile
+
+import uvicorn
+from quart import Quart, request, Response, jsonify
+from quart_cors import cors
+from werkzeug.exceptions import RequestEntityTooLarge
+import breaker
+import cache
+import config
+import gemini_client
+import image_pool
+import metrics
+import pregenerated
 from pipeline import run_pipeline
 
-app = Flask(__name__)
-CORS(app)
+app = cors(Quart(__name__))
+
+# Room for the text fields alongside the image in a multipart upload
+UPLOAD_FORM_OVERHEAD = 256 * 1024
+# Uploads spill from memory to a temp file past this size
+UPLOAD_SPOOL_MEMORY = 1024 * 1024
+
+
+@app.before_serving
+async def warm_caches():
+    """Load the hottest persisted cache entries and the pre-generated answers, and start the image workers before taking traffic."""
+    loaded = cache.preload_all(config.CACHE_PRELOAD)
+    print(f"   Cache preload: {loaded}")
+    pregenerated.load()
+    image_pool.warm()
+
+
+@app.after_serving
+async def stop_workers():
+    image_pool.shutdown()
+    await gemini_client.context_caches.close()
+    cache.flush_all()
 
 
 @app.route("/health", methods=["GET"])
-def health():
-    """Quick connectivity check from the iOS app."""
-    return jsonify({"status": "ok", "app": "bloom"})
+async def health():
+    """Quick connectivity check from the iOS app, plus each model's breaker state."""
+    return jsonify({"status": "ok", "app": "bloom", "gemini": breaker.snapshot()})
+
+
+@app.route("/metrics", methods=["GET"])
+async def metrics_snapshot():
+    """Pipeline counters and hit rates for this worker process."""
+    return jsonify(metrics.snapshot())
 
 
 @app.route("/bloom", methods=["POST"])
-def bloom():
+async def bloom():
     """
     Main endpoint. Expects JSON:
       {
@@ -48,22 +92,119 @@ def bloom():
     Returns SSE stream. Events:
       status  → { message }
       routed  → { pillar, action, reasoning }
+      partial → { field, value } as each response field streams in
+      reset   → {} drop the partials: the reply failed validation
       result  → BloomResponse JSON
-      error   → { error }
+      confidence → { agent, action, confidence }
+      error   → { error, retry_after? }
     """
-    body = request.get_json(force=True, silent=True) or {}
+    body = await request.get_json(force=True, silent=True) or {}
+    return _sse_response(run_pipeline(body))
+
+
+@app.route("/bloom/upload", methods=["POST"])
+async def bloom_upload():
+    """
+    Same pipeline and SSE stream as /bloom, for image requests — the
+    photo travels as binary instead of base64 inside JSON. Either:
+
+      multipart/form-data with fields
+        message, pillar, context (JSON string), and a file part "image"
+
+      or a raw image body (Content-Type: image/jpeg etc.) with the
+      other fields as JSON in an X-Bloom-Request header:
+        { "message": "...", "pillar": "...", "context": { ... } }
+
+    The body is spooled (memory, then disk) as it arrives and the size
+    limit is enforced while streaming — an oversized upload gets a 413
+    without being read to the end. Fields that aren't a JSON object
+    get a 400.
+    """
+    limit = config.UPLOAD_MAX_BYTES
+    if request.content_length and request.content_length > limit + UPLOAD_FORM_OVERHEAD:
+        return _too_large()
+
+    try:
+        if request.mimetype == "multipart/form-data":
+            # Quart's form parser spools file parts and aborts with 413
+            # as soon as the body passes max_content_length
+            request.max_content_length = limit + UPLOAD_FORM_OVERHEAD
+            form = await request.form
+            upload = (await request.files).get("image")
+            body = {
+                "message": form.get("message", ""),
+                "pillar":  form.get("pillar") or None,
+                "context": json.loads(form.get("context") or "{}"),
+            }
+            if not isinstance(body["context"], dict):
+                return _bad_fields()
+            # Quart closes form files when the handler returns, before the
+            # SSE stream decodes the image — move the part into our own spool
+            image = _respool(upload.stream) if upload and upload.filename is not None else None
+        else:
+            body = json.loads(request.headers.get("X-Bloom-Request") or "{}")
+            if not isinstance(body, dict) or not isinstance(body.get("context", {}), dict):
+                return _bad_fields()
+            image = await _spool_body(limit)
+            if image is None:
+                return _too_large()
+    except json.JSONDecodeError:
+        return _bad_fields()
+    except RequestEntityTooLarge:
+        return _too_large()
+
+    return _sse_response(run_pipeline(body, image_file=image))
+
+
+async def _spool_body(limit: int) -> SpooledTemporaryFile | None:
+    """Stream the raw body into a spooled file; None once it passes limit."""
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY)
+    size = 0
+    async for chunk in request.body:
+        size += len(chunk)
+        if size > limit:
+            spool.close()
+            return None
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _respool(stream) -> SpooledTemporaryFile | None:
+    """Copy an uploaded part into a spool the pipeline owns; None if empty."""
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY)
+    shutil.copyfileobj(stream, spool)
+    if not spool.tell():
+        spool.close()
+        return None
+    spool.seek(0)
+    return spool
+
+
+def _bad_fields():
+    return jsonify({"error": "Request fields must be valid JSON"}), 400
+
+
+def _too_large():
+    metrics.incr("upload.rejected_too_large")
+    return jsonify({"error": f"Image upload exceeds {config.UPLOAD_MAX_BYTES} bytes"}), 413
+
 
-    return Response(
-        run_pipeline(body),
+def _sse_response(events) -> Response:
+    response = Response(
+        events,
         mimetype="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
         }
     )
+    # SSE streams can outlive Quart's default response timeout
+    response.timeout = None
+    return response
 
 
 if __name__ == "__main__":
     print("\n🌸 Bloom server starting...")
     print("   Endpoint: POST http://0.0.0.0:8080/bloom\n")
-    app.run(host="0.0.0.0", port=8080, debug=False)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
@@ -9,10 +9,34 @@ the task here, gets the agent class, and calls it.
 """
 
 from dataclasses import dataclass
-from typing import Type
+from typing import Optional, Type
+import config
+import schemas
 from context import BloomContext
 
 
+@dataclass(frozen=True)
+class ModelSettings:
+    """How a task's Gemini calls are made (applied by gemini_client)."""
+    model: str = config.GEMINI_MODEL
+    max_output_tokens: Optional[int] = None     # None = model default
+    thinking_budget: Optional[int] = None       # None = model default, 0 = off
+    temperature: Optional[float] = None
+    latency_slo_ms: Optional[float] = None      # whole call, retries included
+
+
+# Strongest model for anything that assesses the user's body or a photo
+STRONG = ModelSettings(latency_slo_ms=20000)
+# Default for specialists: strong model, bounded thinking
+STANDARD = ModelSettings(thinking_budget=1024, latency_slo_ms=12000)
+# Short reassurance and practical tips: a fast model, no thinking
+FAST = ModelSettings(
+    model=config.GEMINI_FAST_MODEL,
+    max_output_tokens=1024,
+    thinking_budget=0,
+    latency_slo_ms=4000,
+)
+
 
 @dataclass
 class Task:
@@ -23,6 +47,14 @@ class Task:
     agent_class: str            # class name, e.g. "MindAgent"
     description: str            # human-readable description (for debugging/logging)
     requires_image: bool = False
+    keywords: tuple[str, ...] = ()  # phrases the local fast-path router scores on
+    cache_ttl: float = 900          # seconds to reuse an identical-prompt answer; 0 = never
+    semantic_threshold: Optional[float] = None  # opt in to cross-user similar-question reuse
+    semantic_scope: tuple[str, ...] = ()        # context fields the prompt reads (see semantic_cache)
+    photo_dedupe_threshold: Optional[float] = None  # opt in to per-user repeat-photo reuse (see photo_cache)
+    pregenerate: tuple[str, ...] = ()  # enumerable fields the answer depends on (see pregenerated)
+    settings: ModelSettings = STANDARD  # model and generation config for its calls
+    response_schema: Optional[dict] = None  # structured-output schema for its answer (see schemas)
 
 
 # ── Task Registry ──
@@ -40,7 +72,14 @@ _register(Task(
     action="mood_checkin",
     agent_module="agents.mind_agent",
     agent_class="MindAgent",
-    description="Process a mood check-in and provide supportive response"
+    description="Process a mood check-in and provide supportive response",
+    keywords=(
+        "i'm feeling", "im feeling", "i am feeling", "i feel", "mood", "sad",
+        "anxious", "happy", "lonely", "angry", "grateful", "hopeful", "calm",
+        "overwhelmed",
+    ),
+    settings=FAST,
+    response_schema=schemas.MIND
 ))
 
 _register(Task(
@@ -49,7 +88,12 @@ _register(Task(
     action="mood_analysis",
     agent_module="agents.mind_agent",
     agent_class="MindAgent",
-    description="Analyze mood history trend, flag concerns gently"
+    description="Analyze mood history trend, flag concerns gently",
+    keywords=(
+        "mood trend", "my moods", "my mood lately", "pattern", "lately",
+        "past week", "been feeling", "mood history", "how have i been",
+    ),
+    response_schema=schemas.MIND
 ))
 
 _register(Task(
@@ -58,7 +102,17 @@ _register(Task(
     action="breathing_exercise",
     agent_module="agents.mind_agent",
     agent_class="MindAgent",
-    description="Guide the user through a breathing or grounding exercise"
+    description="Guide the user through a breathing or grounding exercise",
+    keywords=(
+        "breathe", "breathing", "breath", "panic", "panicking", "calm down",
+        "grounding", "relax", "racing thoughts", "anxiety attack",
+    ),
+    cache_ttl=86400,
+    semantic_threshold=0.7,
+    semantic_scope=("latest_mood",),
+    pregenerate=("mood_bucket",),
+    settings=FAST,
+    response_schema=schemas.MIND_BREATHING
 ))
 
 _register(Task(
@@ -67,7 +121,12 @@ _register(Task(
     action="general_support",
     agent_module="agents.mind_agent",
     agent_class="MindAgent",
-    description="General emotional support and encouragement"
+    description="General emotional support and encouragement",
+    keywords=(
+        "tired", "exhausted", "struggling", "alone", "can't do this",
+        "cant do this", "need support", "talk to someone",
+    ),
+    response_schema=schemas.MIND
 ))
 
 # --- Body Tasks ---
@@ -77,7 +136,12 @@ _register(Task(
     action="recovery_guidance",
     agent_module="agents.body_agent",
     agent_class="BodyAgent",
-    description="Stage-appropriate physical recovery guidance"
+    description="Stage-appropriate physical recovery guidance",
+    keywords=(
+        "recovery", "recovering", "healing", "heal", "bleeding", "stitches",
+        "tear", "sore", "soreness", "is it normal", "my body",
+    ),
+    response_schema=schemas.BODY
 ))
 
 _register(Task(
@@ -87,7 +151,15 @@ _register(Task(
     agent_module="agents.body_agent",
     agent_class="BodyAgent",
     description="Analyze a photo of healing progress (e.g. C-section incision)",
-    requires_image=True
+    requires_image=True,
+    keywords=(
+        "photo", "picture", "incision", "scar", "wound", "does this look",
+        "look at this",
+    ),
+    cache_ttl=0,
+    photo_dedupe_threshold=0.6,
+    settings=STRONG,
+    response_schema=schemas.BODY
 ))
 
 _register(Task(
@@ -96,7 +168,15 @@ _register(Task(
     action="exercise_recommendation",
     agent_module="agents.body_agent",
     agent_class="BodyAgent",
-    description="Recommend exercises based on delivery type and recovery stage"
+    description="Recommend exercises based on delivery type and recovery stage",
+    keywords=(
+        "exercise", "exercises", "workout", "work out", "stretch", "stretches",
+        "walk", "walking", "pelvic floor", "kegel", "kegels", "core", "yoga",
+        "movement",
+    ),
+    cache_ttl=21600,
+    pregenerate=("recovery_stage", "delivery_type"),
+    response_schema=schemas.BODY
 ))
 
 _register(Task(
@@ -105,7 +185,15 @@ _register(Task(
     action="symptom_check",
     agent_module="agents.body_agent",
     agent_class="BodyAgent",
-    description="Assess described symptoms and advise whether to seek care"
+    description="Assess described symptoms and advise whether to seek care",
+    keywords=(
+        "fever", "swelling", "swollen", "headache", "chills", "discharge",
+        "infection", "redness", "symptom", "symptoms", "hurts", "dizzy",
+        "chest pain",
+    ),
+    cache_ttl=0,
+    settings=STRONG,
+    response_schema=schemas.BODY
 ))
 
 # --- Baby Tasks ---
@@ -116,7 +204,14 @@ _register(Task(
     agent_module="agents.baby_agent",
     agent_class="BabyAgent",
     description="Read baby cues from a photo to determine state",
-    requires_image=True
+    requires_image=True,
+    keywords=(
+        "cue", "cues", "what does she want", "what does he want",
+        "what is she telling", "what is he telling", "body language",
+    ),
+    cache_ttl=0,
+    photo_dedupe_threshold=0.6,
+    response_schema=schemas.BABY
 ))
 
 _register(Task(
@@ -125,7 +220,13 @@ _register(Task(
     action="feeding_guidance",
     agent_module="agents.baby_agent",
     agent_class="BabyAgent",
-    description="Feeding advice based on baby data and recovery stage"
+    description="Feeding advice based on baby data and recovery stage",
+    keywords=(
+        "feed", "feeding", "feeds", "eat", "eating", "breastfeed",
+        "breastfeeding", "bottle", "formula", "latch", "latching", "ounces",
+        "nurse", "nursing", "hungry",
+    ),
+    response_schema=schemas.BABY
 ))
 
 _register(Task(
@@ -134,7 +235,12 @@ _register(Task(
     action="sleep_guidance",
     agent_module="agents.baby_agent",
     agent_class="BabyAgent",
-    description="Sleep pattern guidance for the newborn"
+    description="Sleep pattern guidance for the newborn",
+    keywords=(
+        "sleep", "sleeping", "asleep", "nap", "naps", "won't sleep",
+        "wont sleep", "waking", "wakes up", "bedtime", "night",
+    ),
+    response_schema=schemas.BABY
 ))
 
 _register(Task(
@@ -143,7 +249,14 @@ _register(Task(
     action="general_baby_support",
     agent_module="agents.baby_agent",
     agent_class="BabyAgent",
-    description="General newborn care questions"
+    description="General newborn care questions",
+    keywords=(
+        "baby", "newborn", "diaper", "burp", "burping", "hiccups", "spit up",
+        "jaundice", "bath", "umbilical",
+    ),
+    semantic_threshold=0.85,
+    semantic_scope=("baby_name", "recovery_stage"),
+    response_schema=schemas.BABY
 ))
 
 # --- Partner Tasks ---
@@ -153,7 +266,13 @@ _register(Task(
     action="help_suggestion",
     agent_module="agents.partner_agent",
     agent_class="PartnerAgent",
-    description="Context-aware suggestion for how partner can help right now"
+    description="Context-aware suggestion for how partner can help right now",
+    keywords=(
+        "how can i help", "what can i do", "help her", "help out", "chores",
+        "take over",
+    ),
+    settings=FAST,
+    response_schema=schemas.PARTNER
 ))
 
 _register(Task(
@@ -162,7 +281,12 @@ _register(Task(
     action="emotional_support",
     agent_module="agents.partner_agent",
     agent_class="PartnerAgent",
-    description="Guidance on providing emotional support to the mother"
+    description="Guidance on providing emotional support to the mother",
+    keywords=(
+        "support her", "she's sad", "shes sad", "she's crying", "shes crying",
+        "comfort her", "she seems", "she's upset", "shes upset", "emotional",
+    ),
+    response_schema=schemas.PARTNER
 ))
 
 _register(Task(
@@ -171,7 +295,13 @@ _register(Task(
     action="feeding_help",
     agent_module="agents.partner_agent",
     agent_class="PartnerAgent",
-    description="How the partner can help with feeding and baby care"
+    description="How the partner can help with feeding and baby care",
+    keywords=(
+        "help with feeding", "help feed", "bottle prep", "night feed",
+        "night feeds", "give a bottle",
+    ),
+    settings=FAST,
+    response_schema=schemas.PARTNER
 ))
 
 _register(Task(
@@ -180,19 +310,106 @@ _register(Task(
     action="general_partner_support",
     agent_module="agents.partner_agent",
     agent_class="PartnerAgent",
-    description="General support and encouragement for the partner"
+    description="General support and encouragement for the partner",
+    keywords=(
+        "dad", "i feel useless", "not sure what to do", "new dad",
+        "as a partner", "being a partner",
+    ),
+    semantic_threshold=0.8,
+    semantic_scope=("baby_name", "recovery_stage"),
+    pregenerate=("recovery_stage",),
+    settings=FAST,
+    response_schema=schemas.PARTNER
 ))
 
-def heartbeat(context: BloomContext):
+
+# ── Non-task calls ──
+# Model settings for the calls that aren't a single task's answer.
+CALL_SETTINGS: dict[str, ModelSettings] = {
+    "router": ModelSettings(
+        model=config.GEMINI_FAST_MODEL,
+        max_output_tokens=256,
+        thinking_budget=0,
+        temperature=0.0,
+        latency_slo_ms=2000,
+    ),
+    "confidence": ModelSettings(
+        model=config.GEMINI_FAST_MODEL,
+        max_output_tokens=128,      # a score plus one sentence (RATING_PROMPT)
+        thinking_budget=0,
+        temperature=0.0,
+        latency_slo_ms=2000,
+    ),
+    "combined": STANDARD,
+}
+
+
+# ── Routing Rules ──
+# Routes that are obvious before any model runs. Checked in order by
+# the pipeline ahead of the router; the first match wins. A None
+# condition means "don't care".
+
+@dataclass
+class RouteRule:
+    name: str                           # metric label, e.g. "body_photo"
+    task: str                           # task name to route to
+    reasoning: str                      # synthetic router_reasoning
+    pillar_hint: Optional[str] = None   # tab the request came from
+    has_image: Optional[bool] = None
+    empty_message: Optional[bool] = None
+    has_mood_entry: Optional[bool] = None
+
+    def matches(self, context: BloomContext) -> bool:
+        checks = (
+            (self.pillar_hint, context.pillar_hint),
+            (self.has_image, context.has_image),
+            (self.empty_message, not context.user_message.strip()),
+            (self.has_mood_entry, bool(context.mood_history)),
+        )
+        return all(want is None or want == got for want, got in checks)
+
+
+ROUTING_RULES: list[RouteRule] = [
+    RouteRule(
+        name="body_photo",
+        task="body.photo_analysis",
+        reasoning="Photo uploaded from the Body tab — analyzing healing progress.",
+        pillar_hint="body",
+        has_image=True,
+    ),
+    RouteRule(
+        name="baby_photo",
+        task="baby.cue_reading",
+        reasoning="Photo uploaded from the Baby tab — reading baby's cues.",
+        pillar_hint="baby",
+        has_image=True,
+    ),
+    RouteRule(
+        name="mood_entry",
+        task="mind.mood_checkin",
+        reasoning="No message alongside a logged mood — treating it as a check-in.",
+        empty_message=True,
+        has_mood_entry=True,
+    ),
+]
+
+
+def match_rule(context: BloomContext) -> RouteRule | None:
+    """First routing rule that matches the request, or None."""
+    return next((r for r in ROUTING_RULES if r.matches(context)), None)
+
+
+async def heartbeat(context: BloomContext):
     """
     Periodic reevaluation task.
     Allows Gemini to notice drift even without new input.
     """
     from pipeline import run_pipeline
-    run_pipeline({
+    async for _ in run_pipeline({
         "message": "",
         "context": context.user_context
-    })
+    }):
+        pass
 
 
 def get_task(pillar: str, action: str) -> Task | None:
@@ -208,4 +425,25 @@ def get_tasks_for_pillar(pillar: str) -> list[Task]:
 
 def all_task_names() -> list[str]:
     """All registered task names — useful for the router prompt."""
-    return list(TASK_REGISTRY.keys())
\ No newline at end of file
+    return list(TASK_REGISTRY.keys())
+
+def settings_for(label: str) -> ModelSettings:
+    """Model settings for a call labelled with a task name, "router", etc."""
+    if not config.MODEL_TIERING:
+        return ModelSettings()
+    task = TASK_REGISTRY.get(label)
+    if task is not None:
+        return task.settings
+    return CALL_SETTINGS.get(label, STANDARD)
+
+
+def schema_for(label: str) -> Optional[dict]:
+    """Structured-output schema for a call labelled with a task name, "router", etc."""
+    task = TASK_REGISTRY.get(label)
+    if task is not None:
+        return task.response_schema and schemas.with_confidence(task.response_schema)
+    if label == "router":
+        return schemas.router_schema(all_task_names())
+    if label == "combined":
+        return schemas.combined_schema(all_task_names())
+    return None
@@ -0,0 +1,168 @@
+"""
+Bloom — Fake Gemini API
+========================
+A local fake of the Gemini REST API for the tests. Importing this
+module starts it and points gemini_client at it (so import it before
+anything from the server). Each test scripts how the fake answers
+its next generate requests:
+
+  "ok"      → a normal reply
+  "invalid" → a reply missing a required field
+  "503"     → a server error (retryable)
+  "429"     → a quota error with Retry-After (retryable)
+  "400"     → a bad request (fatal)
+  "slow:N"  → a normal reply after N seconds
+
+Cached contents are kept in memory: create, refresh (PATCH) and
+delete work, and a generate request naming an unknown one gets 403,
+as Gemini answers for an expired cache.
+
+Every test runs on one event loop (run()): the client's pooled
+connections belong to the loop they were opened on.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPLY = '{"title": "T", "content": "C"}'
+INVALID = '{"title": "T", "content": null}'
+RETRY_AFTER = 0.2       # seconds, sent with every 429
+
+
+class FakeGemini(ThreadingHTTPServer):
+    """Answers generateContent / streamGenerateContent from a script."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, *modes: str) -> None:
+        with self.lock:
+            self.script: list[str] = list(modes)
+            self.requests: list[str] = []       # method of each request, in order
+            self.bodies: list[dict] = []        # body of each generate request
+            self.caches: dict[str, str] = {}    # cached content name → system text
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        pass    # a client that timed out and hung up — expected here
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        fake = self.server
+
+        if self.path.split("?")[0].endswith("/cachedContents"):
+            with fake.lock:
+                name = f"cachedContents/c{len(fake.requests) + 1}"
+                fake.caches[name] = body["systemInstruction"]["parts"][0]["text"]
+                fake.requests.append("createCachedContent")
+            return self._json(200, {"name": name, "model": body.get("model")})
+
+        method = self.path.split(":")[-1].split("?")[0]
+        with fake.lock:
+            fake.requests.append(method)
+            fake.bodies.append(body)
+            # A stale cache is refused before the scripted answer is used
+            stale = body.get("cachedContent") and body["cachedContent"] not in fake.caches
+            mode = "403" if stale else fake.script.pop(0) if fake.script else "ok"
+
+        if mode.startswith("slow:"):
+            time.sleep(float(mode[5:]))
+            mode = "ok"
+        if mode not in ("ok", "invalid"):
+            code = int(mode)
+            headers = {"Retry-After": str(RETRY_AFTER)} if code == 429 else {}
+            return self._json(code, {"error": {"code": code, "message": f"fake {code}", "status": "FAKE"}}, headers)
+
+        reply = INVALID if mode == "invalid" else REPLY
+        usage = {"promptTokenCount": 10, "candidatesTokenCount": 5}
+        if body.get("cachedContent"):
+            usage["cachedContentTokenCount"] = 8
+        if method == "streamGenerateContent":
+            self.send_response(200)
+            self.send_header("content-type", "text/event-stream")
+            self.send_header("transfer-encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(reply), 8):
+                event = f"data: {json.dumps(_payload(reply[i:i + 8], usage))}\r\n\r\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self._json(200, _payload(reply, usage))
+
+    def do_PATCH(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        with self.server.lock:
+            self.server.requests.append("updateCachedContent")
+        self._json(200, {"name": _cache_name(self.path)})
+
+    def do_DELETE(self):
+        with self.server.lock:
+            self.server.caches.pop(_cache_name(self.path), None)
+            self.server.requests.append("deleteCachedContent")
+        self._json(200, {})
+
+    def _json(self, code: int, body: dict, headers: dict = {}):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _cache_name(path: str) -> str:
+    return "cachedContents/" + path.split("?")[0].rsplit("/", 1)[-1]
+
+
+def _payload(text: str, usage: dict) -> dict:
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+        "usageMetadata": usage,
+    }
+
+
+# ── Start the fake and point the client at it ──
+fake = FakeGemini()
+threading.Thread(target=fake.serve_forever, daemon=True).start()
+
+os.environ.update({
+    "GEMINI_API_KEY": "test-key",
+    "GEMINI_BASE_URL": fake.url,
+    "BLOOM_GEMINI_TIMEOUT": "0.3",
+    "BLOOM_GEMINI_DEADLINE": "5",
+    "BLOOM_GEMINI_MAX_ATTEMPTS": "3",
+    "BLOOM_GEMINI_BACKOFF": "0.01",
+    "BLOOM_BREAKER": "0",
+    "BLOOM_HEDGE": "0",
+    "BLOOM_DISK_CACHE": "0",
+})
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_runner = asyncio.Runner()
+
+
+def run(coro):
+    """Run coro on the tests' shared event loop."""
+    return _runner.run(coro)
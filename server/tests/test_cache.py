@@ -0,0 +1,60 @@
+"""
+Bloom — Cache Tests
+====================
+The two-tier cache: hits on either tier count toward which disk
+entries are preloaded, and reads never write to SQLite.
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from fake_gemini import fake      # noqa: F401 — first: puts the server on the path
+
+from cache import DiskCache, TTLCache      # noqa: E402
+
+
+class HitCountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.disk = DiskCache(str(Path(self.dir.name) / "cache.db"), max_bytes=1 << 20)
+        self.cache = TTLCache("test", max_entries=10, ttl=60, disk=self.disk)
+
+    def tearDown(self):
+        self.disk._db.close()
+        self.dir.cleanup()
+
+    def test_memory_hits_rank_an_entry_hottest(self):
+        self.cache.set("cold", {"v": 1})
+        self.cache.set("hot", {"v": 2})
+        self.disk.get("test", "cold")       # one disk-tier hit
+        for _ in range(3):
+            self.assertEqual(self.cache.get("hot"), {"v": 2})   # memory-tier hits
+
+        self.assertEqual([key for key, _, _ in self.disk.hottest("test", 2)], ["hot", "cold"])
+
+    def test_reads_do_not_write(self):
+        self.cache.set("key", {"v": 1})
+        written = self.disk._db.total_changes
+        self.cache.get("key")
+        self.disk.get("test", "key")
+        self.assertEqual(self.disk._db.total_changes, written)
+
+        self.disk.flush()
+        self.assertEqual(self.disk._db.total_changes, written + 1)
+
+    def test_hits_survive_a_later_write(self):
+        self.cache.set("a", {"v": 1})
+        self.cache.get("a")
+        self.cache.set("b", {"v": 2})       # flushes a's hit
+        self.assertEqual(self.disk._db.execute(
+            "SELECT hits FROM entries WHERE namespace = 'test' AND key = 'a'"
+        ).fetchone()[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
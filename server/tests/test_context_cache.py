@@ -0,0 +1,229 @@
+"""
+Bloom — Context Cache Tests
+============================
+The context-cache manager against an in-memory backend, the shared
+prompt prefix it caches (behind CONTEXT_CACHE_SHARED_PREFIX), and
+gemini_client naming the cached prefix on the local fake Gemini API
+(see fake_gemini.py).
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import asyncio
+import importlib
+import json
+import time
+import unittest
+from unittest import mock
+
+from fake_gemini import REPLY, fake, run      # first: points the client at the fake
+
+import config                                               # noqa: E402
+import gemini_client                                        # noqa: E402
+from context import BloomContext                            # noqa: E402
+from context_cache import CHARS_PER_TOKEN, ContextCache     # noqa: E402
+from key_pool import ApiKey                                 # noqa: E402
+from prompts import shared                                  # noqa: E402
+from prompts.combined import build_combined_prompt          # noqa: E402
+from prompts.router import build_router_prompt              # noqa: E402
+from tasks import TASK_REGISTRY, all_task_names             # noqa: E402
+
+SYSTEM = "fixed instructions " * 100
+KEY = ApiKey("key1", client=None, rpm=60)
+CONTEXT = BloomContext(
+    user_message="How long should naps be?",
+    user_context={"baby_name": "Ava", "recovery_stage": "week 3", "delivery_type": "vaginal"},
+)
+
+
+class MemoryBackend:
+    """Cached contents in a dict, with a switch to make creates fail."""
+
+    def __init__(self):
+        self.live: dict[str, str] = {}
+        self.created = self.refreshed = self.deleted = 0
+        self.failing = False
+
+    async def create(self, client, model, system, ttl):
+        if self.failing:
+            raise RuntimeError("caching unavailable")
+        self.created += 1
+        name = f"cachedContents/m{self.created}"
+        self.live[name] = system
+        return name
+
+    async def refresh(self, client, name, ttl):
+        self.refreshed += 1
+
+    async def delete(self, client, name):
+        self.deleted += 1
+        self.live.pop(name, None)
+
+
+def settle() -> None:
+    """Let background creates and refreshes finish."""
+    run(asyncio.sleep(0.01))
+
+
+def specialist_prompt(name: str):
+    task = TASK_REGISTRY[name]
+    agent = getattr(importlib.import_module(task.agent_module), task.agent_class)()
+    return agent.build_prompt(task.action, CONTEXT)
+
+
+class ContextCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend()
+        self.cache = ContextCache(self.backend, ttl=100, min_tokens=0)
+
+    def tearDown(self):
+        run(self.cache.close())
+
+    def handle(self):
+        async def get():
+            return self.cache.handle(KEY, "model", SYSTEM)
+        return run(get())
+
+    def test_first_call_creates_and_later_calls_reuse(self):
+        self.assertIsNone(self.handle())
+        settle()
+        name = self.handle()
+        self.assertIsNotNone(name)
+        self.assertEqual(self.handle(), name)
+        self.assertEqual(self.backend.created, 1)
+
+    def test_handle_in_use_near_expiry_is_refreshed(self):
+        self.handle()
+        settle()
+        handle = next(iter(self.cache._handles.values()))
+        handle.expires_at = time.monotonic() + 15   # inside the last REFRESH_SHARE of 100s
+        self.assertEqual(self.handle(), handle.name)
+        settle()
+        self.assertEqual(self.backend.refreshed, 1)
+        self.assertGreater(handle.expires_at - time.monotonic(), 90)
+
+    def test_forgotten_handle_is_recreated(self):
+        self.handle()
+        settle()
+        self.cache.forget(self.handle())
+        self.assertIsNone(self.handle())
+        settle()
+        self.assertIsNotNone(self.handle())
+        self.assertEqual(self.backend.created, 2)
+
+    def test_failed_create_is_not_retried_at_once(self):
+        self.backend.failing = True
+        self.handle()
+        settle()
+        self.backend.failing = False
+        self.assertIsNone(self.handle())
+        settle()
+        self.assertEqual(self.backend.created, 0)
+
+    def test_prefix_under_the_minimum_is_never_cached(self):
+        self.cache.min_tokens = len(SYSTEM)
+        self.assertIsNone(self.handle())
+        settle()
+        self.assertIsNone(self.handle())
+        self.assertEqual(self.backend.created, 0)
+
+    def test_close_deletes_every_handle(self):
+        self.handle()
+        settle()
+        run(self.cache.close())
+        self.assertEqual(self.backend.live, {})
+
+
+def shared_prefix_on(test: unittest.TestCase) -> None:
+    """Turn CONTEXT_CACHE_SHARED_PREFIX on for one test."""
+    patch = mock.patch.object(config, "CONTEXT_CACHE_SHARED_PREFIX", True)
+    patch.start()
+    test.addCleanup(patch.stop)
+
+
+class SharedPrefixTest(unittest.TestCase):
+
+    def setUp(self):
+        shared_prefix_on(self)
+
+    def test_prefix_clears_the_cache_minimum(self):
+        self.assertGreaterEqual(len(shared.prefix()) / CHARS_PER_TOKEN, config.CONTEXT_CACHE_MIN_TOKENS)
+
+    def test_prefix_holds_every_specialist_prompt(self):
+        for name in TASK_REGISTRY:
+            with self.subTest(task=name):
+                self.assertTrue(shared.holds(name, specialist_prompt(name).system))
+
+    def test_prefix_holds_router_and_route_and_answer_prompts(self):
+        router = build_router_prompt("hi", "none", json.dumps(CONTEXT.user_context), all_task_names())
+        self.assertTrue(shared.holds("router", router.system))
+
+        names = ["baby.feeding_guidance", "baby.sleep_guidance"]
+        combined = build_combined_prompt(
+            "hi", "baby", [(n, TASK_REGISTRY[n].description, specialist_prompt(n)) for n in names]
+        )
+        self.assertTrue(shared.holds("combined", combined.system))
+
+    def test_prefix_does_not_hold_another_tasks_prompt(self):
+        self.assertFalse(shared.holds("baby.cue_reading", specialist_prompt("baby.sleep_guidance").system))
+
+
+class CachedCallTest(unittest.TestCase):
+    """gemini_client with the real backend, on the fake API."""
+
+    def setUp(self):
+        fake.reset()
+        shared_prefix_on(self)
+        self.prompt = specialist_prompt("baby.sleep_guidance")
+
+    def tearDown(self):
+        run(gemini_client.context_caches.close())
+
+    def call(self) -> str:
+        return run(gemini_client.call([self.prompt.tail], task="baby.sleep_guidance", system=self.prompt.system))
+
+    def test_prefix_is_cached_once_then_named_by_calls(self):
+        self.assertEqual(self.call(), REPLY)
+        settle()
+        self.assertEqual(self.call(), REPLY)
+        self.assertEqual(self.call(), REPLY)
+
+        self.assertEqual(fake.requests.count("createCachedContent"), 1)
+        self.assertEqual(list(fake.caches.values()), [shared.prefix()])
+
+        first, *later = fake.bodies
+        self.assertIn("systemInstruction", first)
+        self.assertNotIn("cachedContent", first)
+        for body in later:
+            self.assertNotIn("systemInstruction", body)
+            self.assertIn("cachedContent", body)
+            self.assertEqual(body["contents"][0]["parts"][0]["text"], "SECTION: baby.sleep_guidance")
+
+    def test_prompts_keep_their_own_instructions_with_the_prefix_off(self):
+        config.CONTEXT_CACHE_SHARED_PREFIX = False      # restored by the patch
+        self.assertFalse(shared.holds("baby.sleep_guidance", self.prompt.system))
+
+        self.assertEqual(self.call(), REPLY)
+        settle()
+        self.assertEqual(self.call(), REPLY)
+        self.assertNotIn(shared.prefix(), fake.caches.values())
+        for body in fake.bodies:
+            self.assertNotIn("cachedContent", body)
+            self.assertEqual(body["systemInstruction"]["parts"][0]["text"], self.prompt.system)
+
+    def test_expired_cache_is_resent_inline(self):
+        self.call()
+        settle()
+        fake.caches.clear()         # Gemini dropped it
+
+        self.assertEqual(self.call(), REPLY)
+        rejected, resent = fake.bodies[-2:]
+        self.assertIn("cachedContent", rejected)
+        self.assertIn("systemInstruction", resent)
+        self.assertNotIn("cachedContent", resent)
+
+
+if __name__ == "__main__":
+    unittest.main()
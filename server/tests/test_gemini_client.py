@@ -0,0 +1,96 @@
+"""
+Bloom — Gemini Client Tests
+============================
+Retries, deadlines and error classification in gemini_client,
+against a local fake of the Gemini REST API (see fake_gemini.py),
+scripted per test.
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import time
+import unittest
+
+from fake_gemini import REPLY, RETRY_AFTER, fake, run      # first: points the client at the fake
+
+import gemini_client                                        # noqa: E402
+from gemini_client import GeminiError                       # noqa: E402
+
+
+class GeminiClientTest(unittest.TestCase):
+
+    def setUp(self):
+        fake.reset()
+
+    def script(self, *modes: str) -> None:
+        fake.reset(*modes)
+
+    def call(self) -> str:
+        return run(gemini_client.call(["hi"], task="test"))
+
+    def stream(self) -> str:
+        async def collect():
+            return "".join([chunk async for chunk in gemini_client.stream(["hi"], task="test")])
+        return run(collect())
+
+    # ── Retry, then succeed ──
+
+    def test_503_is_retried(self):
+        self.script("503", "ok")
+        self.assertEqual(self.call(), REPLY)
+        self.assertEqual(len(fake.requests), 2)
+
+    def test_429_is_retried_after_retry_after(self):
+        self.script("429", "ok")
+        started = time.monotonic()
+        self.assertEqual(self.call(), REPLY)
+        self.assertEqual(len(fake.requests), 2)
+        # The only key is draining, so the client waits Retry-After out
+        self.assertGreaterEqual(time.monotonic() - started, RETRY_AFTER)
+
+    def test_stream_is_retried_before_first_chunk(self):
+        self.script("503", "503", "ok")
+        self.assertEqual(self.stream(), REPLY)
+        self.assertEqual(fake.requests, ["streamGenerateContent"] * 3)
+
+    # ── Timeouts ──
+
+    def test_slow_attempt_times_out_and_is_retried(self):
+        self.script("slow:1", "ok")
+        started = time.monotonic()
+        self.assertEqual(self.call(), REPLY)
+        self.assertEqual(len(fake.requests), 2)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_timeouts_give_up_after_max_attempts(self):
+        self.script("slow:1", "slow:1", "slow:1")
+        with self.assertRaises(GeminiError) as raised:
+            self.call()
+        self.assertTrue(raised.exception.retryable)
+        self.assertEqual(len(fake.requests), 3)
+
+    # ── Fatal errors ──
+
+    def test_400_is_fatal(self):
+        self.script("400", "ok")
+        with self.assertRaises(GeminiError) as raised:
+            self.call()
+        self.assertEqual(raised.exception.status, 400)
+        self.assertFalse(raised.exception.retryable)
+        self.assertEqual(len(fake.requests), 1)
+
+    def test_stream_400_is_fatal(self):
+        self.script("400", "ok")
+        with self.assertRaises(GeminiError):
+            self.stream()
+        self.assertEqual(len(fake.requests), 1)
+
+    def test_errors_surface_as_runtime_error(self):
+        self.script("503", "503", "503")
+        with self.assertRaises(RuntimeError):
+            self.call()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Bloom — Photo Cache Tests
+==========================
+A re-sent photo from the same install is answered from the repeat
+photo cache, driven through SpecialistAgent.run with the context the
+iOS app sends (UserProfile.contextForServer) on the local fake
+Gemini API (see fake_gemini.py).
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import io
+import unittest
+
+from PIL import Image
+
+from fake_gemini import fake, run      # first: points the client at the fake
+
+import gemini_client                            # noqa: E402
+import metrics                                  # noqa: E402
+import pipeline                                 # noqa: E402
+from agents.body_agent import BodyAgent         # noqa: E402
+from context import BloomContext                # noqa: E402
+from images import preprocess_image             # noqa: E402
+
+
+def app_context(user_id: str) -> dict:
+    """What UserProfile.contextForServer() sends."""
+    return {
+        "user_id": user_id,
+        "user_role": "mom",
+        "delivery_type": "cesarean",
+        "recovery_stage": "weeks_3_6",
+        "baby_name": "Baby Leo",
+        "mood_history": [{"mood": "calm", "note": "", "timestamp": "2026-10-17T09:00:00Z"}],
+        "baby_data": {
+            "baby_name": "Baby Leo",
+            "baby_age_weeks": 3,
+            "last_feed_time": "2 hours ago",
+            "feed_duration_minutes": 20,
+            "sleep_status": "sleeping",
+            "last_nap_time": "1 hour ago",
+        },
+    }
+
+
+def photo_calls() -> int:
+    """Generate requests that carried the photo (not the self-ratings)."""
+    return sum("inlineData" in str(body) or "inline_data" in str(body) for body in fake.bodies)
+
+
+def photo() -> bytes:
+    img = Image.new("RGB", (64, 64))
+    for x in range(64):
+        for y in range(64):
+            img.putpixel((x, y), (x * 4, y * 4, 128))
+    out = io.BytesIO()
+    img.save(out, "JPEG")
+    return out.getvalue()
+
+
+class PhotoCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        fake.reset()
+        self.prepared = preprocess_image(photo())
+
+    def tearDown(self):
+        run(gemini_client.context_caches.close())
+
+    def analyse(self, user_id: str) -> BloomContext:
+        context = BloomContext(
+            user_message="Does my incision look okay?",
+            pillar_hint="body",
+            user_context=app_context(user_id),
+            routed_pillar="body",
+            routed_action="photo_analysis",
+        )
+        pipeline._attach_image(context, self.prepared)
+        run(BodyAgent().run(context))
+        return context
+
+    def test_resent_photo_is_answered_from_cache(self):
+        hits = metrics._counters["cache.photo.hit"]
+        first = self.analyse("install-1")
+        second = self.analyse("install-1")
+
+        self.assertEqual(photo_calls(), 1)
+        self.assertEqual(metrics._counters["cache.photo.hit"], hits + 1)
+        self.assertEqual(second.response, first.response)
+
+    def test_another_install_does_not_share_it(self):
+        self.analyse("install-2")
+        self.analyse("install-3")
+        self.assertEqual(photo_calls(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
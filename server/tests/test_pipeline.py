@@ -0,0 +1,90 @@
+"""
+Bloom — Pipeline Tests
+=======================
+run_pipeline end to end on the local fake Gemini API (see
+fake_gemini.py): which Gemini calls a request actually makes.
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import json
+import unittest
+
+from fake_gemini import fake, run      # first: points the client at the fake
+
+import gemini_client                                        # noqa: E402
+import pipeline                                             # noqa: E402
+from agents.router_agent import _cache_key, router_cache    # noqa: E402
+from context import BloomContext                            # noqa: E402
+
+
+def events(body: dict) -> list[tuple[str, dict]]:
+    """(event, data) for every SSE event the pipeline yields."""
+    async def collect():
+        return [event async for event in pipeline.run_pipeline(body)]
+
+    parsed = []
+    for event in run(collect()):
+        kind, data = event.strip().split("\n", 1)
+        parsed.append((kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+def specialist_calls() -> list[dict]:
+    """Requests that carried a specialist's instructions (inline or cached)."""
+    return [b for b in fake.bodies if "systemInstruction" in b or "cachedContent" in b]
+
+
+class RouterCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        fake.reset()
+
+    def test_cached_route_makes_no_speculative_call(self):
+        body = {"message": "thinking about how the last few days went", "pillar": "mind", "context": {}}
+        context = BloomContext(user_message=body["message"], pillar_hint="mind")
+        router_cache.set(_cache_key(context), {"task": "mind.mood_analysis", "reasoning": "cached"})
+
+        sent = events(body)
+
+        self.assertIn(("routed", {"pillar": "mind", "action": "mood_analysis", "reasoning": "cached"}), sent)
+        self.assertEqual(sent[-2][0], "result")
+        # The routed specialist only — no router call, no speculative guess
+        self.assertEqual(len(specialist_calls()), 1)
+
+
+
+class StreamResetTest(unittest.TestCase):
+
+    def setUp(self):
+        fake.reset()
+
+    def tearDown(self):
+        run(gemini_client.context_caches.close())
+
+    def run_routed(self, message: str, *modes: str) -> list[tuple[str, dict]]:
+        # A message of its own: a cached answer would not stream
+        body = {"message": message, "pillar": "mind", "context": {}}
+        context = BloomContext(user_message=body["message"], pillar_hint="mind")
+        router_cache.set(_cache_key(context), {"task": "mind.mood_analysis", "reasoning": "cached"})
+        fake.reset(*modes)
+        return events(body)
+
+    def test_unusable_streamed_reply_is_reset_before_the_fallback(self):
+        sent = self.run_routed("my mood keeps swinging this week", "invalid")
+        kinds = [kind for kind, _ in sent]
+        self.assertIn("partial", kinds)
+        self.assertLess(kinds.index("partial"), kinds.index("reset"))
+        result = sent[kinds.index("reset") + 1]
+        self.assertEqual(result[0], "result")
+        self.assertTrue(result[1]["degraded"])
+
+    def test_valid_reply_is_not_reset(self):
+        kinds = [kind for kind, _ in self.run_routed("my mood has been steadier lately", "ok")]
+        self.assertIn("partial", kinds)
+        self.assertNotIn("reset", kinds)
+
+
+if __name__ == "__main__":
+    unittest.main()
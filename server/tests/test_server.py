@@ -0,0 +1,75 @@
+"""
+Bloom — Upload Endpoint Tests
+==============================
+/bloom/upload's JSON errors, through Quart's test client: fields that
+aren't a JSON object and oversized bodies are turned away before any
+event is streamed.
+
+Run from the server directory:
+  python -m unittest discover tests
+"""
+
+import io
+import unittest
+from unittest import mock
+
+from werkzeug.datastructures import FileStorage
+
+from fake_gemini import run      # first: points the client at the fake
+
+import metrics                   # noqa: E402
+import pipeline                  # noqa: E402
+import server                    # noqa: E402
+
+
+def photo() -> dict:
+    return {"image": FileStorage(io.BytesIO(b"jpeg"), filename="photo.jpg")}
+
+
+def post(**kwargs):
+    async def send():
+        response = await server.app.test_client().post("/bloom/upload", **kwargs)
+        return response.status_code, await response.get_json()
+    return run(send())
+
+
+class UploadTest(unittest.TestCase):
+
+    def test_header_that_is_not_an_object_is_a_400(self):
+        for header in ("[]", '"x"', '{"context": []}'):
+            with self.subTest(header=header):
+                status, body = post(data=b"jpeg", headers={"Content-Type": "image/jpeg", "X-Bloom-Request": header})
+                self.assertEqual(status, 400)
+                self.assertIn("error", body)
+
+    def test_context_field_that_is_not_an_object_is_a_400(self):
+        status, body = post(form={"message": "hi", "context": "[]"}, files=photo())
+        self.assertEqual(status, 400)
+        self.assertIn("error", body)
+
+    def test_oversized_multipart_is_a_json_413(self):
+        rejected = metrics._counters["upload.rejected_too_large"]
+        # Under the Content-Length check, but a field past Quart's form
+        # memory limit — rejected mid-parse
+        status, body = post(form={"message": "x" * 600_000}, files=photo())
+        self.assertEqual(status, 413)
+        self.assertIn("error", body)
+        self.assertEqual(metrics._counters["upload.rejected_too_large"], rejected + 1)
+
+
+class ShedTest(unittest.TestCase):
+
+    def test_shed_request_closes_the_spooled_image(self):
+        image = io.BytesIO(b"jpeg")
+
+        async def collect():
+            return [e async for e in pipeline.run_pipeline({"message": "hi"}, image_file=image)]
+
+        with mock.patch.object(pipeline.gemini_limiter, "saturated", return_value=True):
+            sent = run(collect())
+        self.assertTrue(sent[0].startswith("event: error"))
+        self.assertTrue(image.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()